@@ -1,19 +1,37 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
 from uuid import uuid4
 from dataclasses import dataclass
 
 import jwt
 from jwt import InvalidTokenError
 
+from app.cache import TTLCache
+
 
 @dataclass(frozen=True)
 class AuthResult:
     user_id: str | None
     is_authenticated: bool
     token_id: str | None = None
+    expires_at: datetime | None = None
+
+
+_UNAUTHENTICATED = AuthResult(user_id=None, is_authenticated=False)
+
+# Access tokens that passed verification, keyed by a digest of the token so the cache never
+# holds a usable credential. An entry lives until the token's exp, which is exactly as long
+# as jwt.decode would keep accepting it; a chat turn's tool calls then skip the HMAC and the
+# JSON decode. Rejected tokens are not cached.
+@lru_cache(maxsize=1)
+def _verified() -> TTLCache:
+    return TTLCache(maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096")), ttl=0)
 
 
 def _jwt_secret() -> str:
@@ -36,25 +54,48 @@ def _refresh_ttl_days() -> int:
     return int(os.getenv("REFRESH_TOKEN_TTL_DAYS", "7"))
 
 
-def decode_bearer_token(auth_header: str | None) -> AuthResult:
+def bearer_token(auth_header: str | None) -> str | None:
+    """The token from an `Authorization: Bearer <token>` header, or None."""
     if not auth_header:
-        return AuthResult(user_id=None, is_authenticated=False)
-
+        return None
     parts = auth_header.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
-        return AuthResult(user_id=None, is_authenticated=False)
+        return None
+    return parts[1]
+
 
-    token = parts[1]
+def decode_bearer_token(auth_header: str | None) -> AuthResult:
+    return decode_access_token(bearer_token(auth_header))
+
+
+def decode_access_token(token: str | None) -> AuthResult:
+    if not token:
+        return _UNAUTHENTICATED
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _verified().get(key)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, _jwt_secret(), algorithms=["HS256"])
     except InvalidTokenError:
-        return AuthResult(user_id=None, is_authenticated=False)
+        return _UNAUTHENTICATED
 
     user_id = payload.get("sub")
     if not isinstance(user_id, str) or not user_id:
-        return AuthResult(user_id=None, is_authenticated=False)
+        return _UNAUTHENTICATED
+
+    expires_at = payload.get("exp")
+    if not isinstance(expires_at, int):
+        return AuthResult(user_id=user_id, is_authenticated=True)
+    auth = AuthResult(
+        user_id=user_id, is_authenticated=True, expires_at=datetime.fromtimestamp(expires_at, timezone.utc)
+    )
+    _verified().set(key, auth, ttl=expires_at - time.time())
+    return auth
 
-    return AuthResult(user_id=user_id, is_authenticated=True)
+
+def token_cache_stats() -> dict[str, Any]:
+    return _verified().stats()
 
 
 def create_token(user_id: str) -> str:
@@ -96,4 +137,13 @@ def decode_refresh_token(token: str | None) -> AuthResult:
     token_id = payload.get("jti")
     if not isinstance(token_id, str) or not token_id:
         return AuthResult(user_id=None, is_authenticated=False)
-    return AuthResult(user_id=user_id, is_authenticated=True, token_id=token_id)
+    # The expiry bounds how long the token's revocation record has to be kept.
+    expires_at = payload.get("exp")
+    if not isinstance(expires_at, int):
+        return AuthResult(user_id=None, is_authenticated=False)
+    return AuthResult(
+        user_id=user_id,
+        is_authenticated=True,
+        token_id=token_id,
+        expires_at=datetime.fromtimestamp(expires_at, timezone.utc),
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+
+from app import repository
+from app.cache import TTLCache
+
+
+# Read-through cache for a user's booking reads. Entries are keyed by the user's booking
+# version, a counter in Mongo that every booking write bumps. Each worker re-reads that
+# counter at most once per BOOKING_CACHE_VERSION_TTL_SECONDS, so a write on another worker
+# shows up here within that window, even when this worker's entries are still fresh.
+# Cached documents are shared between callers and must not be mutated.
+@lru_cache(maxsize=1)
+def _entries() -> TTLCache:
+    return TTLCache(
+        maxsize=int(os.getenv("BOOKING_CACHE_SIZE", "4096")),
+        ttl=float(os.getenv("BOOKING_CACHE_TTL_SECONDS", "60")),
+    )
+
+
+@lru_cache(maxsize=1)
+def _versions() -> TTLCache:
+    return TTLCache(
+        maxsize=int(os.getenv("BOOKING_CACHE_SIZE", "4096")),
+        ttl=float(os.getenv("BOOKING_CACHE_VERSION_TTL_SECONDS", "2")),
+    )
+
+
+async def _version(user_id: str) -> int:
+    version = _versions().get(user_id)
+    if version is None:
+        version = await repository.get_booking_version(user_id)
+        _versions().set(user_id, version)
+    return version
+
+
+async def _read_through(user_id: str, key: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+    if _entries().maxsize <= 0 or not user_id:
+        return await load()
+    full_key = (user_id, await _version(user_id), *key)
+    # Wrapped in a tuple so a cached None ("no such booking") is a hit, not a miss.
+    hit = _entries().get(full_key)
+    if hit is not None:
+        return hit[0]
+    value = await load()
+    _entries().set(full_key, (value,), tags=(f"user:{user_id}",))
+    return value
+
+
+async def find_latest_booking(user_id: str) -> dict[str, Any] | None:
+    return await _read_through(user_id, ("latest",), lambda: repository.find_latest_booking(user_id))
+
+
+async def find_bookings(
+    user_id: str,
+    origin: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    when: str | None = None,
+    *,
+    limit: int = 0,
+    after: tuple[Any, Any] | None = None,
+) -> list[dict[str, Any]]:
+    return await _read_through(
+        user_id,
+        ("list", origin, destination, status, when, limit, after),
+        lambda: repository.find_bookings(
+            user_id, origin, destination, status, when, limit=limit, after=after
+        ),
+    )
+
+
+async def count_bookings(
+    user_id: str,
+    origin: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    when: str | None = None,
+) -> int:
+    return await _read_through(
+        user_id,
+        ("count", origin, destination, status, when),
+        lambda: repository.count_bookings(user_id, origin, destination, status, when),
+    )
+
+
+async def find_booking_by_flight(user_id: str, flight_number: str) -> dict[str, Any] | None:
+    return await _read_through(
+        user_id,
+        ("flight", flight_number),
+        lambda: repository.find_booking_by_flight(user_id, flight_number),
+    )
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Call after any write to the user's bookings: drops local entries and tells other workers."""
+    await repository.bump_booking_version(user_id)
+    _entries().invalidate_tag(f"user:{user_id}")
+    _versions().invalidate(user_id)
+
+
+def stats() -> dict[str, Any]:
+    return _entries().stats()
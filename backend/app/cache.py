@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Entries can carry tags so every entry derived from one source document can be
+    dropped at once when that document changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, tags: Iterable[str] = (), ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: Any) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Any) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+# Chat turns on one checkpoint thread run one at a time: two overlapping graph runs (two
+# tabs, a double-send) would each start from the same checkpoint and one reply would be
+# lost. A thread holds at most CHAT_MAX_QUEUED_PER_THREAD turns waiting behind the running
+# one. Across threads, at most CHAT_MAX_CONCURRENT_RUNS graph runs execute per worker;
+# past that a turn is refused at once rather than left to pile up latency.
+
+
+class ThreadBusyError(RuntimeError):
+    """Too many turns already queued on this chat thread."""
+
+
+class ChatOverloadedError(RuntimeError):
+    """The worker is already running its limit of graph runs."""
+
+
+@dataclass
+class _Thread:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    holders: int = 0  # everyone holding or waiting for the lock, including background tasks
+    turns: int = 0  # chat turns only; what CHAT_MAX_QUEUED_PER_THREAD bounds
+
+
+_THREADS: dict[str, _Thread] = {}
+_IN_FLIGHT: dict[tuple[str, str], asyncio.Future] = {}
+_STATS: Counter = Counter()
+_running = 0
+
+
+def _max_runs() -> int:
+    return int(os.getenv("CHAT_MAX_CONCURRENT_RUNS", "32"))
+
+
+def _max_queued() -> int:
+    return int(os.getenv("CHAT_MAX_QUEUED_PER_THREAD", "2"))
+
+
+def check_capacity(thread_id: str) -> None:
+    """Fail fast, before a streaming response commits to a 200, if a turn would be refused."""
+    thread = _THREADS.get(thread_id)
+    if thread and thread.turns > _max_queued():
+        _STATS["thread_busy"] += 1
+        raise ThreadBusyError("Another reply on this conversation is still in progress")
+    if _running >= _max_runs():
+        _STATS["overloaded"] += 1
+        raise ChatOverloadedError("The assistant is busy, retry shortly")
+
+
+@asynccontextmanager
+async def thread_lock(thread_id: str) -> AsyncIterator[None]:
+    """Exclusive access to a thread's checkpoint, without the turn limits (background writers)."""
+    thread = _THREADS.setdefault(thread_id, _Thread())
+    thread.holders += 1
+    try:
+        async with thread.lock:
+            yield
+    finally:
+        thread.holders -= 1
+        if not thread.holders:
+            _THREADS.pop(thread_id, None)
+
+
+@asynccontextmanager
+async def turn(thread_id: str) -> AsyncIterator[None]:
+    """One chat turn: queue behind the thread's running turn, then take a global run slot."""
+    global _running
+    check_capacity(thread_id)
+    thread = _THREADS.setdefault(thread_id, _Thread())
+    thread.turns += 1
+    try:
+        async with thread_lock(thread_id):
+            # Re-checked: the limit may have been reached while this turn was queued.
+            if _running >= _max_runs():
+                _STATS["overloaded"] += 1
+                raise ChatOverloadedError("The assistant is busy, retry shortly")
+            _running += 1
+            _STATS["runs"] += 1
+            try:
+                yield
+            finally:
+                _running -= 1
+    finally:
+        thread.turns -= 1
+
+
+def _coalesce_key(thread_id: str, message: str) -> tuple[str, str]:
+    return thread_id, " ".join(message.split()).casefold()
+
+
+async def run_turn(thread_id: str, message: str, run: Callable[[], Awaitable[T]]) -> T:
+    """Run a chat turn under `turn`, sharing the result with identical messages sent meanwhile.
+
+    A message equal to one already queued or running on the same thread (a double-send,
+    a retry) waits for that turn's reply instead of running the graph again.
+    """
+    key = _coalesce_key(thread_id, message)
+    while (leader := _IN_FLIGHT.get(key)) is not None:
+        _STATS["coalesced"] += 1
+        try:
+            return await asyncio.shield(leader)
+        except asyncio.CancelledError:
+            if not leader.cancelled():
+                raise
+            # The first sender went away before its reply was ready; run the turn here.
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    # Followers read the outcome; this keeps an unread exception from being logged.
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    _IN_FLIGHT[key] = future
+    try:
+        async with turn(thread_id):
+            result = await run()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        if _IN_FLIGHT.get(key) is future:
+            del _IN_FLIGHT[key]
+
+
+def stats() -> dict[str, Any]:
+    return {
+        "running": _running,
+        "max_running": _max_runs(),
+        "active_threads": len(_THREADS),
+        "queued_turns": sum(max(thread.turns - 1, 0) for thread in _THREADS.values()),
+        "runs": _STATS["runs"],
+        "coalesced": _STATS["coalesced"],
+        "rejected_thread_busy": _STATS["thread_busy"],
+        "rejected_overloaded": _STATS["overloaded"],
+    }
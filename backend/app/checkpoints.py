@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+
+logger = logging.getLogger(__name__)
+
+# 100-ns intervals between the Gregorian epoch and the Unix epoch, as used by uuid6.
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_last: int
+    idle_ttl_seconds: float
+    interval_seconds: float
+    vacuum_every: int
+
+
+def retention_policy_from_env() -> RetentionPolicy:
+    return RetentionPolicy(
+        keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", "20")),
+        idle_ttl_seconds=float(os.getenv("CHECKPOINT_IDLE_TTL_HOURS", "168")) * 3600,
+        interval_seconds=float(os.getenv("CHECKPOINT_COMPACT_INTERVAL_SECONDS", "600")),
+        vacuum_every=int(os.getenv("CHECKPOINT_VACUUM_EVERY", "6")),
+    )
+
+
+def _checkpoint_id_at(epoch_seconds: float) -> str:
+    """Smallest uuid6 checkpoint id LangGraph could have generated at `epoch_seconds`.
+
+    Checkpoint ids are uuid6, so comparing them as strings compares creation times.
+    """
+    timestamp = int(epoch_seconds * 10_000_000) + _UUID_EPOCH_OFFSET
+    value = ((timestamp >> 12) & 0xFFFFFFFFFFFF) << 80
+    value |= 0x6 << 76
+    value |= (timestamp & 0x0FFF) << 64
+    value |= 0x8 << 60
+    return str(UUID(int=value))
+
+
+async def _execute(conn: Any, sql: str, params: tuple = ()) -> int:
+    # Cursors are closed right away: VACUUM refuses to run while any statement is open.
+    async with conn.execute(sql, params) as cursor:
+        return cursor.rowcount
+
+
+async def configure_sqlite(saver: Any) -> None:
+    await saver.setup()
+    async with saver.lock:
+        await _execute(saver.conn, "PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL skips the fsync on every commit and only risks the newest commits on power loss.
+        await _execute(saver.conn, "PRAGMA synchronous=NORMAL")
+        await _execute(saver.conn, "PRAGMA journal_size_limit=67108864")
+        await saver.conn.commit()
+
+
+async def compact_sqlite(saver: Any, policy: RetentionPolicy, vacuum: bool = False) -> dict[str, int]:
+    cutoff = _checkpoint_id_at(time.time() - policy.idle_ttl_seconds)
+    async with saver.lock:
+        conn = saver.conn
+        idle = """
+            SELECT thread_id FROM checkpoints
+            GROUP BY thread_id HAVING MAX(checkpoint_id) < ?
+        """
+        idle_writes = await _execute(conn, f"DELETE FROM writes WHERE thread_id IN ({idle})", (cutoff,))
+        idle_checkpoints = await _execute(
+            conn, f"DELETE FROM checkpoints WHERE thread_id IN ({idle})", (cutoff,)
+        )
+        pruned_checkpoints = await _execute(
+            conn,
+            """
+            DELETE FROM checkpoints WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                    ) AS rank
+                    FROM checkpoints
+                ) WHERE rank > ?
+            )
+            """,
+            (policy.keep_last,),
+        )
+        pruned_writes = await _execute(
+            conn,
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """,
+        )
+        await conn.commit()
+        if vacuum:
+            await _execute(conn, "PRAGMA wal_checkpoint(TRUNCATE)")
+            await _execute(conn, "VACUUM")
+            await _execute(conn, "ANALYZE")
+        else:
+            await _execute(conn, "PRAGMA optimize")
+        await conn.commit()
+    return {
+        "idle_checkpoints": idle_checkpoints,
+        "idle_writes": idle_writes,
+        "pruned_checkpoints": pruned_checkpoints,
+        "pruned_writes": pruned_writes,
+    }
+
+
+async def run_sqlite_compaction(saver: Any, policy: RetentionPolicy) -> None:
+    runs = 0
+    while True:
+        await asyncio.sleep(policy.interval_seconds)
+        runs += 1
+        vacuum = policy.vacuum_every > 0 and runs % policy.vacuum_every == 0
+        try:
+            result = await compact_sqlite(saver, policy, vacuum=vacuum)
+        except Exception:  # keep the loop alive; the next run retries
+            logger.exception("Checkpoint compaction failed")
+            continue
+        logger.info("Checkpoint compaction: %s (vacuum=%s)", result, vacuum)
+
+
+async def sqlite_stats(saver: Any, path: Path) -> dict[str, int]:
+    size = 0
+    for suffix in ("", "-wal", "-shm"):
+        candidate = Path(f"{path}{suffix}")
+        if candidate.exists():
+            size += candidate.stat().st_size
+    await saver.setup()
+    async with saver.lock:
+        async with saver.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT thread_id) FROM checkpoints"
+        ) as cursor:
+            checkpoints, threads = await cursor.fetchone()
+        async with saver.conn.execute("SELECT COUNT(*) FROM writes") as cursor:
+            (writes,) = await cursor.fetchone()
+    return {"size_bytes": size, "threads": threads, "checkpoints": checkpoints, "writes": writes}
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+
+def parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp into an aware UTC datetime. Naive values are taken as UTC."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    # pymongo hands BSON dates back as naive datetimes that are already in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def iso_utc(value: datetime) -> str:
+    # Runs once per booking on every read, so it avoids strftime and tz conversion for the
+    # naive UTC values pymongo returns.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds") + "Z"
+
+
+def display_datetime(value: datetime) -> str:
+    return as_utc(value).strftime("%b %d, %Y at %I:%M %p UTC")
+
+
+def booking_date_fields(value: datetime | str) -> dict[str, Any]:
+    """Stored form of a booking date: a BSON datetime plus the rendered text, computed once at write time."""
+    parsed = parse_iso_datetime(value) if isinstance(value, str) else as_utc(value)
+    return {"date": parsed, "date_display": display_datetime(parsed)}
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
+from typing import Any
 
 from pymongo import MongoClient
 from pymongo.collection import Collection
@@ -15,28 +16,77 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _db_name() -> str:
+    return os.getenv("MONGODB_DB_NAME", "booking_assistant")
+
+
+def bookings_collection_name() -> str:
+    return os.getenv("MONGODB_BOOKINGS_COLLECTION", "bookings")
+
+
+def users_collection_name() -> str:
+    return os.getenv("MONGODB_USERS_COLLECTION", "users")
+
+
+def flight_info_collection_name() -> str:
+    return os.getenv("MONGODB_FLIGHT_INFO_COLLECTION", "flight_info")
+
+
+def booking_versions_collection_name() -> str:
+    return os.getenv("MONGODB_BOOKING_VERSIONS_COLLECTION", "booking_versions")
+
+
+def revoked_tokens_collection_name() -> str:
+    return os.getenv("MONGODB_REVOKED_TOKENS_COLLECTION", "revoked_tokens")
+
+
+def checkpoints_collection_name() -> str:
+    return os.getenv("MONGODB_CHECKPOINTS_COLLECTION", "checkpoints")
+
+
+def checkpoint_writes_collection_name() -> str:
+    return os.getenv("MONGODB_CHECKPOINT_WRITES_COLLECTION", "checkpoint_writes")
+
+
 @lru_cache(maxsize=1)
 def get_client() -> MongoClient:
     uri = _require_env("MONGODB_URI")
+    if uri.startswith("mongomock://"):
+        # In-memory stand-in for local runs and tests; nothing outlives the process.
+        try:
+            import mongomock
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("MONGODB_URI=mongomock:// requires the 'mongomock' package") from exc
+        return mongomock.MongoClient()
     return MongoClient(uri)
 
 
 @lru_cache(maxsize=1)
 def get_db() -> Database:
-    db_name = os.getenv("MONGODB_DB_NAME", "booking_assistant")
-    return get_client()[db_name]
+    return get_client()[_db_name()]
+
+
+@lru_cache(maxsize=1)
+def get_async_client() -> Any:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("MONGODB_ASYNC_DRIVER=motor requires the 'motor' package") from exc
+    return AsyncIOMotorClient(_require_env("MONGODB_URI"))
+
+
+@lru_cache(maxsize=1)
+def get_async_db() -> Any:
+    return get_async_client()[_db_name()]
 
 
 def get_bookings_collection() -> Collection:
-    name = os.getenv("MONGODB_BOOKINGS_COLLECTION", "bookings")
-    return get_db()[name]
+    return get_db()[bookings_collection_name()]
 
 
 def get_users_collection() -> Collection:
-    name = os.getenv("MONGODB_USERS_COLLECTION", "users")
-    return get_db()[name]
+    return get_db()[users_collection_name()]
 
 
 def get_flight_info_collection() -> Collection:
-    name = os.getenv("MONGODB_FLIGHT_INFO_COLLECTION", "flight_info")
-    return get_db()[name]
+    return get_db()[flight_info_collection_name()]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Any
+
+from app.retrieval import split_chunks
+
+
+# Bump when extraction changes; documents with older facts are re-extracted by
+# `python -m app.migrations` and answered by the LLM until then.
+FACTS_VERSION = 1
+
+_AIRCRAFT = re.compile(
+    r"\b(Airbus|Boeing|Embraer|ATR|Bombardier|De Havilland)\s+([A-Z]*\d[\w-]*[A-Za-z0-9])"
+)
+_KG = re.compile(r"(\d+(?:\.\d+)?)\s*kg\b", re.IGNORECASE)
+_BAGGAGE_KIND = re.compile(r"check|cabin|carry-on|hand")
+_WIFI = re.compile(r"\bwi-?fi\b", re.IGNORECASE)
+_WIFI_NONE = re.compile(r"\bnot (?:available|offered)|\bunavailable|\bno wi-?fi")
+_WIFI_FREE = re.compile(r"\bfree\b|\bcomplimentary\b")
+_WIFI_PAID = re.compile(r"\bpaid\b|\bfee\b|\bpurchase\b|\bcharge")
+_PITCH = re.compile(
+    r"pitch\D{0,20}?(\d+(?:\.\d+)?)\s*(?:in\b|inch|\")"
+    r"|(\d+(?:\.\d+)?)\s*(?:in\b|inch(?:es)?\b|\")\s*(?:seat\s+)?pitch",
+    re.IGNORECASE,
+)
+
+# A template only answers a question that asks for exactly the field it fills: the topic
+# keyword alone ("seat", "plane", "type") also turns up in questions about charging ports,
+# exit rows or delays. Per topic: a pattern the question must match, and one it must not.
+_ASKS_FOR: dict[str, tuple[re.Pattern, re.Pattern]] = {
+    "baggage": (
+        re.compile(r"\b(?:allowance|allowed|limit|how (?:much|many|heavy)|kg|weight|can i (?:take|bring|check))"),
+        re.compile(
+            r"\b(?:fee|cost|price|pay|extra|excess|lost|delayed|damaged|sports?|pets?|stroller|liquids?)\b"
+        ),
+    ),
+    "wifi": (
+        re.compile(r"\b(?:is|does|do|any|have|has|available|offer(?:ed|s)?|free|paid|can i (?:use|get))\b"),
+        re.compile(r"\b(?:password|connect|speed|fast|slow|stream\w*|log ?in|how (?:do|to|much)|cost|price)\b"),
+    ),
+    "aircraft": (
+        re.compile(r"\b(?:what|which)\b.*\b(?:aircraft|plane|jet)\b|\b(?:aircraft|plane) (?:type|model)\b"),
+        re.compile(
+            r"\b(?:delay\w*|late|on time|seats?|age|old|safe\w*|wi-?fi|power|usb|charg\w*|gate|depart\w*|land\w*"
+            r"|arriv\w*|take off|takes off|boarding|status|cancel\w*)\b"
+        ),
+    ),
+    "seating": (
+        re.compile(r"\bpitch\b|\bleg ?room\b|\bseat size\b|\bhow much (?:space|room)\b"),
+        re.compile(
+            r"\b(?:exit rows?|extra|more|usb|charg\w*|power|outlets?|sockets?|recline|window|aisle|select|choose"
+            r"|change|upgrade|assign\w*|fee|cost|price|business|premium)\b"
+        ),
+    ),
+}
+
+_ANSWERS: Counter = Counter()
+
+
+def _number(value: str) -> int | float:
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _baggage_kind(sentence: str, match: re.Match) -> str:
+    # The word right after the weight wins ("20kg checked"), then the closest one before it
+    # ("Checked baggage is limited to 25kg").
+    after = _BAGGAGE_KIND.search(sentence[match.end():match.end() + 20].lower())
+    if after:
+        kind = after.group(0)
+    else:
+        before = _BAGGAGE_KIND.findall(sentence[max(0, match.start() - 30):match.start()].lower())
+        if not before:
+            return ""
+        kind = before[-1]
+    return "checked" if kind == "check" else "cabin"
+
+
+def _wifi(sentence: str) -> str:
+    lowered = sentence.lower()
+    if _WIFI_NONE.search(lowered):
+        return "none"
+    if _WIFI_FREE.search(lowered):
+        return "free"
+    if _WIFI_PAID.search(lowered):
+        return "paid"
+    return "available"
+
+
+def extract_flight_facts(details_text: str) -> dict[str, Any]:
+    """Structured fields pulled from a flight-info document at write time.
+
+    A field is set only when the text gives it exactly one value; a document that states two
+    different allowances, say, leaves that field to the LLM.
+    """
+    found: dict[str, set] = {}
+    for sentence in split_chunks(details_text):
+        for aircraft in _AIRCRAFT.finditer(sentence):
+            found.setdefault("aircraft", set()).add(f"{aircraft.group(1)} {aircraft.group(2)}")
+        for match in _KG.finditer(sentence):
+            kind = _baggage_kind(sentence, match)
+            if kind:
+                found.setdefault(f"baggage_{kind}_kg", set()).add(_number(match.group(1)))
+        if _WIFI.search(sentence):
+            found.setdefault("wifi", set()).add(_wifi(sentence))
+        for pitch in _PITCH.finditer(sentence):
+            found.setdefault("seat_pitch_in", set()).add(_number(pitch.group(1) or pitch.group(2)))
+    facts: dict[str, Any] = {"version": FACTS_VERSION}
+    facts.update((field, values.pop()) for field, values in found.items() if len(values) == 1)
+    return facts
+
+
+def _baggage_answer(flight_number: str, facts: dict[str, Any]) -> str | None:
+    parts = []
+    if "baggage_checked_kg" in facts:
+        parts.append(f"{facts['baggage_checked_kg']} kg of checked baggage")
+    if "baggage_cabin_kg" in facts:
+        parts.append(f"{facts['baggage_cabin_kg']} kg of cabin baggage")
+    if not parts:
+        return None
+    return f"Flight {flight_number} allows {' and '.join(parts)}."
+
+
+def _wifi_answer(flight_number: str, facts: dict[str, Any]) -> str | None:
+    wifi = facts.get("wifi")
+    if wifi == "none":
+        return f"Wi-Fi is not available on flight {flight_number}."
+    if wifi in {"free", "paid"}:
+        return f"Wi-Fi is available on flight {flight_number} ({wifi})."
+    if wifi == "available":
+        return f"Wi-Fi is available on flight {flight_number}."
+    return None
+
+
+def _aircraft_answer(flight_number: str, facts: dict[str, Any]) -> str | None:
+    if "aircraft" not in facts:
+        return None
+    return f"Flight {flight_number} is flown on the {facts['aircraft']}."
+
+
+def _seating_answer(flight_number: str, facts: dict[str, Any]) -> str | None:
+    if "seat_pitch_in" not in facts:
+        return None
+    return f"Seat pitch on flight {flight_number} is {facts['seat_pitch_in']} in."
+
+
+_TEMPLATES = {
+    "baggage": _baggage_answer,
+    "wifi": _wifi_answer,
+    "aircraft": _aircraft_answer,
+    "seating": _seating_answer,
+}
+
+
+def asks_for_field(topic: str, question: str) -> bool:
+    """True if the question asks for the field the topic's template fills, and nothing else."""
+    patterns = _ASKS_FOR.get(topic)
+    if patterns is None:
+        return False
+    asks, excluded = patterns
+    lowered = question.lower()
+    return bool(asks.search(lowered)) and not excluded.search(lowered)
+
+
+def answer_from_facts(
+    flight_number: str, topic: str, facts: dict[str, Any] | None, question: str
+) -> str | None:
+    """A templated answer when the question asks for a stored field, else None (ask the LLM)."""
+    template = _TEMPLATES.get(topic)
+    if not template or not facts or facts.get("version") != FACTS_VERSION:
+        return None
+    if not asks_for_field(topic, question):
+        return None
+    return template(flight_number, facts)
+
+
+def record_answer(topic: str, source: str) -> None:
+    """Count one flight-info answer, by topic and source ("facts" or "llm")."""
+    _ANSWERS[(topic or "none", source)] += 1
+
+
+def answer_stats() -> dict[str, Any]:
+    facts = sum(count for (_, source), count in _ANSWERS.items() if source == "facts")
+    llm = sum(count for (_, source), count in _ANSWERS.items() if source == "llm")
+    by_topic: dict[str, dict[str, int]] = {}
+    for (topic, source), count in sorted(_ANSWERS.items()):
+        by_topic.setdefault(topic, {})[source] = count
+    return {
+        "facts": facts,
+        "llm": llm,
+        "llm_fallback_rate": round(llm / (facts + llm), 4) if facts + llm else 0.0,
+        "by_topic": by_topic,
+    }
@@ -1,6 +1,5 @@
-from datetime import datetime, timezone
+import asyncio
 import os
-import re
 import aiosqlite
 from pathlib import Path
 
@@ -14,21 +13,51 @@ from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 CHECKPOINTER_KIND = "unknown"
 CHECKPOINTER = None
+CHECKPOINT_PATH: Path | None = None
 _ASYNC_SQLITE_CONN = None
+_MAINTENANCE_TASK: asyncio.Task | None = None
+_BACKGROUND_TASKS: set = set()
+_BOOKINGS_SHOWN = 5
 from langgraph.graph import END, StateGraph
 
+from app import intent_cache
+from app.chat_threads import thread_lock
+from app.cache import TTLCache
+from app.checkpoints import (
+    configure_sqlite,
+    retention_policy_from_env,
+    run_sqlite_compaction,
+    sqlite_stats,
+)
+from app.flight_facts import answer_from_facts, record_answer
+from app.http_client import ToolUnavailableError
+from app.intent import match_intent
+from app.metrics import INTENT_ROUTES, timed_node
+from app.mongo_checkpointer import MongoCheckpointSaver
+from app.retrieval import retrieve_context
 from app.state import AgentState
-from app.llm import booking_response, chat_completion, classify_intent, flight_info_response
+from app.llm import (
+    booking_response,
+    chat_completion,
+    classify_intent,
+    flight_info_response,
+    summarize_conversation,
+)
 from app.tools import (
-    get_all_bookings_via_api,
-    get_booking_by_flight_via_api,
-    get_flight_info_via_api,
-    get_latest_booking_via_api,
+    count_bookings,
+    get_all_bookings,
+    get_booking_by_flight,
+    get_flight_info,
+    get_latest_booking,
 )
 from app.users import get_user_by_id
 
+# /health is probed often and the stats COUNT(*) both tables under the saver's lock.
+_CHECKPOINT_STATS = TTLCache(maxsize=1, ttl=0)
+_TOOL_UNAVAILABLE_REPLY = "The booking service is temporarily unavailable. Please try again in a moment."
+
 
-def agent_node(state: AgentState) -> AgentState:
+async def agent_node(state: AgentState) -> AgentState:
     messages = state.get("messages", [])
     if not messages:
         return {"messages": [AIMessage(content="Hi! Ask me about your bookings.")] }
@@ -37,7 +66,7 @@ def agent_node(state: AgentState) -> AgentState:
     if last_human and _is_greeting(last_human.content):
         display_name = "there"
         if state.get("is_authenticated") and state.get("user_id"):
-            user = get_user_by_id(state.get("user_id", ""))
+            user = await get_user_by_id(state.get("user_id", ""))
             if user and user.username:
                 display_name = user.username
         return {
@@ -47,22 +76,25 @@ def agent_node(state: AgentState) -> AgentState:
         }
 
     if last_human:
-        intent, flight_number, info_topic = _determine_intent(last_human.content)
+        intent, flight_number, info_topic = await _determine_intent(last_human.content)
         if intent in {"latest", "all", "flight"}:
             return {"intent": intent, "flight_number": flight_number, "info_topic": info_topic}
         if intent == "flight_info":
             return {"intent": intent, "flight_number": flight_number, "info_topic": info_topic}
 
-    prompt = _to_groq_messages(messages)
+    prompt = _to_groq_messages(messages, state.get("summary", ""), state.get("summarized_count", 0))
     try:
-        content = chat_completion(prompt)
+        content = await chat_completion(prompt, stream=True)
     except RuntimeError:
         content = "I can help with booking info. Try asking about your next flight."
     return {"messages": [AIMessage(content=content)], "intent": "unknown", "flight_number": "", "info_topic": ""}
 
 
 async def booking_latest_node(state: AgentState) -> AgentState:
-    booking = await get_latest_booking_via_api(state.get("access_token", ""))
+    try:
+        booking = await get_latest_booking(state.get("access_token", ""))
+    except ToolUnavailableError:
+        return {"messages": [AIMessage(content=_TOOL_UNAVAILABLE_REPLY)]}
     if not booking:
         return {
             "messages": [
@@ -75,16 +107,17 @@ async def booking_latest_node(state: AgentState) -> AgentState:
     content = (
         "Your latest booking is "
         f"{booking.get('flight_number', '')} from {booking.get('origin', '')} "
-        f"to {booking.get('destination', '')} on {_format_iso_datetime(booking.get('date', ''))} "
+        f"to {booking.get('destination', '')} on {booking.get('date_display', '')} "
         f"(status: {booking.get('status', '')})."
     )
     try:
-        content = booking_response(
+        content = await booking_response(
             {
+                "booking_id": booking.get("booking_id", ""),
                 "flight_number": booking.get("flight_number", ""),
                 "origin": booking.get("origin", ""),
                 "destination": booking.get("destination", ""),
-                "date": _format_iso_datetime(booking.get("date", "")),
+                "date": booking.get("date_display", ""),
                 "status": booking.get("status", ""),
             }
         )
@@ -94,26 +127,35 @@ async def booking_latest_node(state: AgentState) -> AgentState:
 
 
 async def booking_all_node(state: AgentState) -> AgentState:
-    bookings = await get_all_bookings_via_api(state.get("access_token", ""))
+    access_token = state.get("access_token", "")
+    try:
+        bookings = await get_all_bookings(access_token, limit=_BOOKINGS_SHOWN)
+        # Only a full page can have more behind it.
+        total = await count_bookings(access_token) if len(bookings) == _BOOKINGS_SHOWN else len(bookings)
+    except ToolUnavailableError:
+        return {"messages": [AIMessage(content=_TOOL_UNAVAILABLE_REPLY)]}
     if not bookings:
         return {"messages": [AIMessage(content="I couldn't find any bookings for your account.")]}
     lines = []
-    for booking in bookings[:5]:
+    for booking in bookings:
         lines.append(
             f"{booking.get('flight_number', '')}: {booking.get('origin', '')} → "
-            f"{booking.get('destination', '')} on {_format_iso_datetime(booking.get('date', ''))} "
+            f"{booking.get('destination', '')} on {booking.get('date_display', '')} "
             f"({booking.get('status', '')})"
         )
     extra = ""
-    if len(bookings) > 5:
-        extra = f" And {len(bookings) - 5} more."
+    if total > len(bookings):
+        extra = f" And {total - len(bookings)} more."
     content = "Here are your bookings: " + "; ".join(lines) + extra
     return {"messages": [AIMessage(content=content)]}
 
 
 async def booking_flight_node(state: AgentState) -> AgentState:
     flight_number = state.get("flight_number", "")
-    booking = await get_booking_by_flight_via_api(state.get("access_token", ""), flight_number)
+    try:
+        booking = await get_booking_by_flight(state.get("access_token", ""), flight_number)
+    except ToolUnavailableError:
+        return {"messages": [AIMessage(content=_TOOL_UNAVAILABLE_REPLY)]}
     if not booking:
         return {
             "messages": [
@@ -124,7 +166,7 @@ async def booking_flight_node(state: AgentState) -> AgentState:
         }
     content = (
         f"Flight {booking.get('flight_number', '')} is from {booking.get('origin', '')} "
-        f"to {booking.get('destination', '')} on {_format_iso_datetime(booking.get('date', ''))} "
+        f"to {booking.get('destination', '')} on {booking.get('date_display', '')} "
         f"(status: {booking.get('status', '')})."
     )
     return {"messages": [AIMessage(content=content)]}
@@ -138,32 +180,37 @@ async def flight_info_node(state: AgentState) -> AgentState:
                 AIMessage(content="Which flight number do you want details for?")
             ]
         }
-    info = await get_flight_info_via_api(state.get("access_token", ""), flight_number)
+    try:
+        info = await get_flight_info(state.get("access_token", ""), flight_number)
+    except ToolUnavailableError:
+        return {"messages": [AIMessage(content=_TOOL_UNAVAILABLE_REPLY)]}
     if not info:
         return {
             "messages": [
                 AIMessage(content=f"I couldn't find info for flight {flight_number}.")
             ]
         }
+    info_topic = state.get("info_topic", "")
+    last_human = _last_human_message(state.get("messages", []))
+    question = last_human.content if last_human else "Provide flight details."
+    answer = answer_from_facts(flight_number, info_topic, info.get("facts"), question)
+    if answer:
+        record_answer(info_topic, "facts")
+        return {"messages": [AIMessage(content=answer)]}
+    record_answer(info_topic, "llm")
     content = f"Here are the details for flight {flight_number}."
     try:
-        last_human = _last_human_message(state.get("messages", []))
-        question = last_human.content if last_human else "Provide flight details."
-        content = flight_info_response(
-            details_text=info.get("details_text", ""),
+        context = retrieve_context(flight_number, info.get("details_text", ""), question, info_topic)
+        content = await flight_info_response(
+            details_text=context,
             question=question,
+            flight_number=flight_number,
         )
     except RuntimeError:
         pass
     return {"messages": [AIMessage(content=content)]}
 
 
-def _needs_booking_lookup(text: str) -> bool:
-    lowered = text.lower()
-    keywords = ("booking", "flight", "ticket", "where am i flying", "where am i travelling")
-    return any(k in lowered for k in keywords)
-
-
 def _is_greeting(text: str) -> bool:
     lowered = text.lower().strip()
     greetings = ("hi", "hello", "hey", "good morning", "good afternoon", "good evening")
@@ -190,70 +237,82 @@ def _last_human_message(messages: list[HumanMessage | AIMessage]):
     return None
 
 
-def _format_iso_datetime(value: str) -> str:
-    if not value:
-        return "an unknown time"
+async def _determine_intent(text: str) -> tuple[str, str, str]:
+    match = match_intent(text)
+    if match is not None:
+        INTENT_ROUTES.inc("rules", match.intent)
+        return match.intent, match.flight_number, match.info_topic
+    cached = intent_cache.lookup(text)
+    if cached is not None:
+        INTENT_ROUTES.inc("cache", cached[0])
+        return cached[0], "", ""
     try:
-        if value.endswith("Z"):
-            value = value[:-1] + "+00:00"
-        parsed = datetime.fromisoformat(value)
-        if parsed.tzinfo is None:
-            parsed = parsed.replace(tzinfo=timezone.utc)
-        local = parsed.astimezone()
-        return local.strftime("%b %d, %Y at %I:%M %p %Z")
-    except ValueError:
-        return value
-
-
-def _normalize_text(text: str) -> str:
-    text = re.sub(r"[\u2010-\u2015]", "-", text)
-    return " ".join(re.sub(r"[^a-z0-9\s-]", " ", text.lower()).split())
-
-
-def _determine_intent(text: str) -> tuple[str, str, str]:
-    normalized = _normalize_text(text)
-    info_topic = ""
-    if any(k in normalized for k in ("meal", "food", "snack")):
-        info_topic = "meals"
-    elif "wifi" in normalized:
-        info_topic = "wifi"
-    elif "baggage" in normalized or "luggage" in normalized:
-        info_topic = "baggage"
-    elif "aircraft" in normalized or "plane" in normalized or "type" in normalized:
-        info_topic = "aircraft"
-    elif "seat" in normalized or "legroom" in normalized or "pitch" in normalized:
-        info_topic = "seating"
-    flight_match = re.search(r"\b([A-Z]{2,3}-?\d{2,4})\b", text.upper().replace("–", "-").replace("—", "-").replace("‑", "-"))
-    if flight_match:
-        if info_topic:
-            return "flight_info", flight_match.group(1), info_topic
-        return "flight", flight_match.group(1), ""
-    if re.search(r"\b(all|list|show)\s+(my\s+)?flight(s)?\b", normalized) or re.search(
-        r"\b(all|list|show)\s+(my\s+)?booking(s)?\b", normalized
-    ) or re.search(r"\b(all|list|show)\s+(my\s+)?trip(s)?\b", normalized):
-        return "all", "", ""
-    if re.search(r"\b(latest|next|upcoming)\b", normalized) or "where am i flying" in normalized:
-        return "latest", "", ""
-    if any(k in normalized for k in ("itinerary", "travel plans", "trip info")):
-        return "all", "", ""
-    if info_topic:
-        return "flight_info", "", info_topic
-    if _needs_booking_lookup(text):
-        return "latest", "", ""
-    try:
-        data = classify_intent(text)
-        return data.get("intent", "unknown"), data.get("flight_number", ""), ""
+        data = await classify_intent(text)
     except RuntimeError:
+        INTENT_ROUTES.inc("llm_error", "unknown")
         return "unknown", "", ""
+    intent, flight_number = data.get("intent", "unknown"), data.get("flight_number", "")
+    intent_cache.remember(text, intent, flight_number)
+    INTENT_ROUTES.inc("llm", intent)
+    return intent, flight_number, ""
+
+
+def _context_token_budget() -> int:
+    return int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+
+
+def _context_token_limit() -> int:
+    return int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", str(2 * _context_token_budget())))
+
+
+def _context_min_messages() -> int:
+    return int(os.getenv("CHAT_CONTEXT_MIN_MESSAGES", "4"))
+
+
+def _estimate_tokens(message: HumanMessage | AIMessage) -> int:
+    # Roughly four characters per token plus per-message overhead; close enough for budgeting.
+    return len(str(message.content)) // 4 + 4
+
+
+def _window_start(messages: list[HumanMessage | AIMessage]) -> int:
+    """Index of the oldest message that still fits in the verbatim context window."""
+    budget = _context_token_budget()
+    used = 0
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        used += _estimate_tokens(messages[index])
+        if used > budget and start < len(messages):
+            break
+        start = index
+    return start
+
+
+def _prompt_start(messages: list[HumanMessage | AIMessage], summarized_count: int) -> int:
+    """Index of the oldest message sent verbatim.
+
+    The budget only trims messages the summary already covers: anything after
+    summarized_count stays until a refresh folds it into the summary. If refreshes keep
+    failing, that tail is cut back to the budget once it passes CHAT_CONTEXT_MAX_TOKENS,
+    always keeping the newest CHAT_CONTEXT_MIN_MESSAGES.
+    """
+    window = _window_start(messages)
+    start = min(window, summarized_count)
+    if sum(_estimate_tokens(message) for message in messages[start:]) > _context_token_limit():
+        start = max(start, min(window, len(messages) - _context_min_messages()))
+    return start
 
 
-def _to_groq_messages(messages: list[HumanMessage | AIMessage]) -> list[dict[str, str]]:
+def _to_groq_messages(
+    messages: list[HumanMessage | AIMessage], summary: str = "", summarized_count: int = 0
+) -> list[dict[str, str]]:
     system_prompt = (
         "You are a secure booking assistant. Be concise and helpful. "
         "If the user asks about bookings, tell them you will check their latest booking."
     )
     converted: list[dict[str, str]] = [{"role": "system", "content": system_prompt}]
-    for message in messages:
+    if summary:
+        converted.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    for message in messages[_prompt_start(messages, summarized_count):]:
         if isinstance(message, HumanMessage):
             converted.append({"role": "user", "content": message.content})
         elif isinstance(message, AIMessage):
@@ -261,26 +320,37 @@ def _to_groq_messages(messages: list[HumanMessage | AIMessage]) -> list[dict[str
     return converted
 
 
+def _checkpointer_backend() -> str:
+    return os.getenv("CHECKPOINTER_BACKEND", "sqlite").lower()
+
+
 def build_graph():
-    global CHECKPOINTER_KIND, CHECKPOINTER
+    global CHECKPOINTER_KIND, CHECKPOINTER, CHECKPOINT_PATH
     checkpointer = None
-    if SqliteSaver is not None:
+    backend = _checkpointer_backend()
+    if backend == "mongo":
+        checkpointer = MongoCheckpointSaver()
+        CHECKPOINTER_KIND = "mongo"
+    elif backend == "sqlite" and SqliteSaver is not None:
         default_path = Path(__file__).resolve().parents[1] / "checkpoints.sqlite"
         checkpoint_path = Path(os.getenv("CHECKPOINT_DB", str(default_path)))
+        CHECKPOINT_PATH = checkpoint_path
         global _ASYNC_SQLITE_CONN
         _ASYNC_SQLITE_CONN = aiosqlite.connect(str(checkpoint_path))
         checkpointer = AsyncSqliteSaver(_ASYNC_SQLITE_CONN)
         CHECKPOINTER_KIND = "sqlite-async"
-    else:
+    elif backend in {"sqlite", "memory"}:
         checkpointer = MemorySaver()
         CHECKPOINTER_KIND = "memory"
+    else:
+        raise RuntimeError(f"Unknown CHECKPOINTER_BACKEND: {backend}")
     CHECKPOINTER = checkpointer
     graph = StateGraph(AgentState)
-    graph.add_node("agent", agent_node)
-    graph.add_node("booking_latest", booking_latest_node)
-    graph.add_node("booking_all", booking_all_node)
-    graph.add_node("booking_flight", booking_flight_node)
-    graph.add_node("flight_info", flight_info_node)
+    graph.add_node("agent", timed_node("agent", agent_node))
+    graph.add_node("booking_latest", timed_node("booking_latest", booking_latest_node))
+    graph.add_node("booking_all", timed_node("booking_all", booking_all_node))
+    graph.add_node("booking_flight", timed_node("booking_flight", booking_flight_node))
+    graph.add_node("flight_info", timed_node("flight_info", flight_info_node))
     graph.set_entry_point("agent")
     graph.add_conditional_edges(
         "agent",
@@ -300,6 +370,124 @@ def build_graph():
     return graph.compile(checkpointer=checkpointer)
 
 
+async def stream_turn(graph, state: AgentState, config: dict):
+    """Run one chat turn, yielding ("node" | "token" | "done", payload) events as they happen."""
+    running = "agent"
+    partial: list[str] = []
+    reply = None
+    try:
+        async for mode, chunk in graph.astream(state, config=config, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                token = chunk.get("token") if isinstance(chunk, dict) else None
+                if token:
+                    partial.append(token)
+                    yield "token", {"text": token}
+                continue
+            for node, update in chunk.items():
+                update = update or {}
+                messages = update.get("messages") or []
+                if messages:
+                    reply = messages[-1].content
+                elif node == "agent":
+                    running = _route_from_agent(update)
+                partial.clear()
+                yield "node", {"node": node}
+        yield "done", {"reply": reply or ""}
+    finally:
+        if reply is None:
+            # The client went away mid-turn. Record what was produced so the thread does not
+            # keep a dangling question; run detached because this task is being cancelled.
+            task = asyncio.create_task(_save_interrupted_reply(graph, config, running, "".join(partial)))
+            _BACKGROUND_TASKS.add(task)
+            task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _save_interrupted_reply(graph, config: dict, node: str, partial: str) -> None:
+    # Waits for the cancelled turn to give up the thread, and keeps the next turn out until
+    # the reply is written.
+    async with thread_lock(config["configurable"]["thread_id"]):
+        snapshot = await graph.aget_state(config)
+        messages = snapshot.values.get("messages", []) if snapshot else []
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return
+        content = f"{partial.strip()} …" if partial.strip() else "(response interrupted)"
+        values: dict = {"messages": [AIMessage(content=content)]}
+        if node in (END, "agent"):
+            node = "agent"
+            values.update({"intent": "unknown", "flight_number": "", "info_topic": ""})
+        await graph.aupdate_state(config, values, as_node=node)
+
+
+def schedule_summary(graph, config: dict) -> None:
+    """Fold messages that slid out of the context window into the thread summary, in the background."""
+    task = asyncio.create_task(_refresh_summary(graph, config))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _refresh_summary(graph, config: dict) -> None:
+    snapshot = await graph.aget_state(config)
+    if not snapshot or snapshot.next:
+        return
+    values = snapshot.values
+    messages = values.get("messages", [])
+    done = values.get("summarized_count", 0)
+    start = _window_start(messages)
+    if start - done < int(os.getenv("CHAT_SUMMARY_MIN_MESSAGES", "6")):
+        return
+    older = [
+        {"role": "user" if isinstance(m, HumanMessage) else "assistant", "content": str(m.content)}
+        for m in messages[done:start]
+        if isinstance(m, (HumanMessage, AIMessage))
+    ]
+    try:
+        summary = await summarize_conversation(values.get("summary", ""), older)
+    except RuntimeError:
+        return
+    # The LLM call runs unlocked so it never delays the user's next turn; the write takes the
+    # thread lock, so it cannot interleave with a turn, and is dropped if another refresh won.
+    async with thread_lock(config["configurable"]["thread_id"]):
+        current = await graph.aget_state(config)
+        if not current or current.next or current.values.get("summarized_count", 0) != done:
+            return
+        # Written as the agent with intent reset so the update routes straight to END.
+        await graph.aupdate_state(
+            config,
+            {"summary": summary, "summarized_count": start, "intent": "unknown"},
+            as_node="agent",
+        )
+
+
+async def start_checkpoint_maintenance() -> None:
+    global _MAINTENANCE_TASK
+    if CHECKPOINTER_KIND != "sqlite-async" or _MAINTENANCE_TASK is not None:
+        return
+    await configure_sqlite(CHECKPOINTER)
+    _MAINTENANCE_TASK = asyncio.create_task(run_sqlite_compaction(CHECKPOINTER, retention_policy_from_env()))
+
+
+async def stop_checkpoint_maintenance() -> None:
+    global _MAINTENANCE_TASK
+    if _MAINTENANCE_TASK is None:
+        return
+    _MAINTENANCE_TASK.cancel()
+    try:
+        await _MAINTENANCE_TASK
+    except asyncio.CancelledError:
+        pass
+    _MAINTENANCE_TASK = None
+
+
+async def checkpoint_stats() -> dict[str, int] | None:
+    if CHECKPOINTER_KIND != "sqlite-async" or CHECKPOINT_PATH is None:
+        return None
+    stats = _CHECKPOINT_STATS.get("sqlite")
+    if stats is None:
+        stats = await sqlite_stats(CHECKPOINTER, CHECKPOINT_PATH)
+        _CHECKPOINT_STATS.set("sqlite", stats, ttl=float(os.getenv("CHECKPOINT_STATS_TTL_SECONDS", "60")))
+    return stats
+
+
 async def clear_checkpoint(thread_id: str) -> None:
     if not thread_id or CHECKPOINTER is None:
         return
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+
+_RETRYABLE_STATUS = {502, 503, 504}
+
+
+class ToolUnavailableError(RuntimeError):
+    """Raised when the remote booking API is down, timing out or behind an open breaker."""
+
+
+@dataclass
+class CircuitBreaker:
+    failure_threshold: int
+    reset_after: float
+    failures: int = 0
+    opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("TOOL_HTTP_HTTP2", "0") != "1":
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:  # pragma: no cover - optional dependency
+        return False
+    return True
+
+
+class ToolHttpClient:
+    def __init__(self) -> None:
+        self.base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+        self.deadline = float(os.getenv("TOOL_HTTP_DEADLINE_SECONDS", "5"))
+        self.retries = int(os.getenv("TOOL_HTTP_RETRIES", "2"))
+        self.retry_backoff = float(os.getenv("TOOL_HTTP_RETRY_BACKOFF_MS", "50")) / 1000
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("TOOL_HTTP_BREAKER_THRESHOLD", "5")),
+            reset_after=float(os.getenv("TOOL_HTTP_BREAKER_RESET_SECONDS", "30")),
+        )
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("TOOL_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("TOOL_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("TOOL_HTTP_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.http2 = _http2_enabled()
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=limits,
+            timeout=httpx.Timeout(self.deadline),
+            http2=self.http2,
+        )
+        self._in_flight = 0
+        self._requests = 0
+        self._retried = 0
+        self._failures = 0
+        self._rejected = 0
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def get(self, path: str, access_token: str, deadline: float | None = None) -> httpx.Response:
+        if not self.breaker.allow():
+            self._rejected += 1
+            raise ToolUnavailableError("Booking API circuit is open")
+        try:
+            return await asyncio.wait_for(
+                self._get_with_retries(path, access_token), timeout=deadline or self.deadline
+            )
+        except asyncio.TimeoutError as exc:
+            self._failures += 1
+            self.breaker.record_failure()
+            raise ToolUnavailableError(f"Booking API deadline exceeded for {path}") from exc
+
+    async def _get_with_retries(self, path: str, access_token: str) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {access_token}"}
+        attempt = 0
+        while True:
+            self._in_flight += 1
+            self._requests += 1
+            try:
+                resp = await self._client.get(path, headers=headers)
+            except httpx.TransportError as exc:
+                error: Exception = exc
+            else:
+                if resp.status_code not in _RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    return resp
+                error = ToolUnavailableError(f"Booking API returned {resp.status_code} for {path}")
+            finally:
+                self._in_flight -= 1
+            self._failures += 1
+            self.breaker.record_failure()
+            if attempt >= self.retries or not self.breaker.allow():
+                raise ToolUnavailableError(str(error) or type(error).__name__) from error
+            attempt += 1
+            self._retried += 1
+            await asyncio.sleep(self.retry_backoff * attempt)
+
+    def stats(self) -> dict[str, Any]:
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "connections": len(connections),
+            "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+            "in_flight": self._in_flight,
+            "requests": self._requests,
+            "retries": self._retried,
+            "failures": self._failures,
+            "rejected": self._rejected,
+            "circuit": self.breaker.state,
+        }
+
+
+_CLIENT: ToolHttpClient | None = None
+
+
+def get_tool_http_client() -> ToolHttpClient:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ToolHttpClient()
+    return _CLIENT
+
+
+async def startup() -> None:
+    get_tool_http_client()
+
+
+async def shutdown() -> None:
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+def pool_stats() -> dict[str, Any] | None:
+    return _CLIENT.stats() if _CLIENT is not None else None
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from pymongo import ASCENDING, DESCENDING
+
+from app import repository
+from app.db import (
+    booking_versions_collection_name,
+    bookings_collection_name,
+    checkpoint_writes_collection_name,
+    checkpoints_collection_name,
+    flight_info_collection_name,
+    revoked_tokens_collection_name,
+    users_collection_name,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: Callable[[], str]
+    name: str
+    keys: list[tuple[str, int]]
+    unique: bool = False
+    expire_after_seconds: int | None = None
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """One query the app issues, with sample values, for the explain() check."""
+
+    name: str
+    collection: Callable[[], str]
+    filter: dict[str, Any]
+    sort: list[tuple[str, int]] = field(default_factory=list)
+    limit: int = 0
+
+
+CHECKPOINT_INDEXES = [
+    IndexSpec(
+        checkpoints_collection_name,
+        "thread_checkpoint",
+        [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", DESCENDING)],
+        unique=True,
+    ),
+    IndexSpec(
+        checkpoint_writes_collection_name,
+        "thread_checkpoint_write",
+        [
+            ("thread_id", ASCENDING),
+            ("checkpoint_ns", ASCENDING),
+            ("checkpoint_id", ASCENDING),
+            ("task_id", ASCENDING),
+            ("idx", ASCENDING),
+        ],
+        unique=True,
+    ),
+]
+
+INDEX_SPECS = [
+    # Latest booking and the filtered, keyset-paged booking list: equality on user_id, then
+    # the (date, _id) sort. origin/destination/status are filters over the user's rows.
+    IndexSpec(
+        bookings_collection_name,
+        "user_date_id",
+        [("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+    ),
+    IndexSpec(bookings_collection_name, "user_flight", [("user_id", ASCENDING), ("flight_number", ASCENDING)]),
+    IndexSpec(users_collection_name, "username", [("username", ASCENDING)], unique=True),
+    IndexSpec(users_collection_name, "user_id", [("user_id", ASCENDING)], unique=True),
+    IndexSpec(flight_info_collection_name, "flight_number", [("flight_number", ASCENDING)], unique=True),
+    # Mongo's TTL monitor deletes a revoked token once the token itself has expired.
+    IndexSpec(revoked_tokens_collection_name, "expires_at_ttl", [("expires_at", ASCENDING)], expire_after_seconds=0),
+    *CHECKPOINT_INDEXES,
+]
+
+_SAMPLE_DATE = datetime(2026, 4, 1, 9, 30, tzinfo=timezone.utc)
+
+# Every query shape in app/repository.py and app/mongo_checkpointer.py. Keep in sync.
+QUERY_SHAPES = [
+    QueryShape(
+        "find_latest_booking", bookings_collection_name, {"user_id": "user_123"}, repository.BOOKING_ORDER, 1
+    ),
+    QueryShape("find_bookings", bookings_collection_name, {"user_id": "user_123"}, repository.BOOKING_ORDER),
+    QueryShape(
+        "find_bookings(filtered)",
+        bookings_collection_name,
+        {"user_id": "user_123", "origin": "Pune", "destination": "Delhi", "status": "Confirmed"},
+        repository.BOOKING_ORDER,
+    ),
+    QueryShape(
+        "find_bookings(after)",
+        bookings_collection_name,
+        {
+            "user_id": "user_123",
+            "date": {"$lte": _SAMPLE_DATE},
+            "$or": [{"date": {"$lt": _SAMPLE_DATE}}, {"_id": {"$lt": "booking_102"}}],
+        },
+        repository.BOOKING_ORDER,
+        5,
+    ),
+    QueryShape(
+        "find_bookings(upcoming)",
+        bookings_collection_name,
+        {"user_id": "user_123", "date": {"$gte": _SAMPLE_DATE}},
+        repository.UPCOMING_ORDER,
+    ),
+    QueryShape(
+        "find_bookings(past)",
+        bookings_collection_name,
+        {"user_id": "user_123", "date": {"$lt": _SAMPLE_DATE}},
+        repository.BOOKING_ORDER,
+    ),
+    QueryShape("count_bookings", bookings_collection_name, {"user_id": "user_123"}),
+    QueryShape(
+        "find_booking_by_flight",
+        bookings_collection_name,
+        {"user_id": "user_123", "flight_number": "AI-888"},
+        limit=1,
+    ),
+    QueryShape("ensure_booking", bookings_collection_name, {"_id": "booking_101"}, limit=1),
+    QueryShape("get_booking_version", booking_versions_collection_name, {"_id": "user_123"}, limit=1),
+    QueryShape("find_flight_info", flight_info_collection_name, {"flight_number": "AI-888"}, limit=1),
+    QueryShape("find_user_by_username", users_collection_name, {"username": "user_123"}, limit=1),
+    QueryShape("find_user_by_id", users_collection_name, {"user_id": "user_123"}, limit=1),
+    QueryShape(
+        "checkpoint_latest",
+        checkpoints_collection_name,
+        {"thread_id": "user_123", "checkpoint_ns": ""},
+        [("checkpoint_id", -1)],
+        1,
+    ),
+    QueryShape(
+        "checkpoint_list_before",
+        checkpoints_collection_name,
+        {"thread_id": "user_123", "checkpoint_ns": "", "checkpoint_id": {"$lt": "1f0"}},
+        [("checkpoint_id", -1)],
+    ),
+    QueryShape("checkpoint_delete_thread", checkpoints_collection_name, {"thread_id": "user_123"}),
+    QueryShape(
+        "checkpoint_writes",
+        checkpoint_writes_collection_name,
+        {"thread_id": "user_123", "checkpoint_ns": "", "checkpoint_id": "1f0"},
+        [("task_id", 1), ("idx", 1)],
+    ),
+    QueryShape("checkpoint_writes_delete_thread", checkpoint_writes_collection_name, {"thread_id": "user_123"}),
+]
+
+
+async def ensure_indexes(specs: list[IndexSpec] | None = None) -> list[str]:
+    """Create any missing index. Existing indexes with the same name and keys are a no-op."""
+    created: list[str] = []
+    for spec in INDEX_SPECS if specs is None else specs:
+        collection_name = spec.collection()
+        options: dict[str, Any] = {"name": spec.name, "unique": spec.unique}
+        if spec.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = spec.expire_after_seconds
+        try:
+            await repository.get_collection(collection_name).create_index(spec.keys, **options)
+        except Exception:  # one bad index (e.g. duplicates under a unique key) must not block startup
+            logger.exception("Could not create index %s.%s", collection_name, spec.name)
+            continue
+        created.append(f"{collection_name}.{spec.name}")
+    return created
+
+
+def plan_stages(plan: Any) -> list[str]:
+    """All stage names in an explain() plan tree, in either the classic or the SBE layout."""
+    stages: list[str] = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    flight_number: str = ""
+    info_topic: str = ""
+
+
+# Rule table, in precedence order. Keyword rules are substring checks on the normalized
+# message; phrase rules are word-bounded regexes, each guarded by the substrings it needs.
+_TOPIC_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("meals", ("meal", "food", "snack")),
+    ("wifi", ("wifi",)),
+    ("baggage", ("baggage", "luggage")),
+    ("aircraft", ("aircraft", "plane", "type")),
+    ("seating", ("seat", "legroom", "pitch")),
+)
+_PHRASE_RULES: tuple[tuple[str, str, tuple[str, ...]], ...] = (
+    ("all", r"(?:all|list|show)\s+(?:my\s+)?(?:flight|booking|trip)s?", ("all", "list", "show")),
+    ("latest", r"latest|next|upcoming", ("latest", "next", "upcoming")),
+)
+_LATEST_KEYWORDS = ("where am i flying",)
+_ALL_KEYWORDS = ("itinerary", "travel plans", "trip info")
+# Checked against the raw lower-cased message, not the normalized one.
+_LOOKUP_KEYWORDS = ("booking", "flight", "ticket", "where am i flying", "where am i travelling")
+
+
+class _NormalizeTable(dict):
+    """str.translate table: unicode dashes to "-", anything outside [a-z0-9\\s-] to a space."""
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        if "‐" <= char <= "―":
+            value = "-"
+        elif "a" <= char <= "z" or "0" <= char <= "9" or char == "-" or char.isspace():
+            value = char
+        else:
+            value = " "
+        self[codepoint] = value
+        return value
+
+
+_NORMALIZE_TABLE = _NormalizeTable()
+_TOPIC_KEYWORDS = tuple((topic, keyword) for topic, keywords in _TOPIC_RULES for keyword in keywords)
+_PHRASE_PATTERN = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in _PHRASE_RULES) + r")\b"
+)
+_PHRASE_TRIGGERS = tuple(trigger for _, _, triggers in _PHRASE_RULES for trigger in triggers)
+# A flight number is [A-Z]{2,3}-?\d{2,4} on a word boundary. The leading boundary is checked
+# by hand so the regex can start with a character class and skip ahead quickly.
+_FLIGHT_PATTERN = re.compile(r"([A-Z]{2,3}-?\d{2,4})\b")
+_DIGIT = re.compile(r"\d")
+_WORD_CHAR = re.compile(r"\w")
+
+
+_ALL = IntentMatch("all")
+_LATEST = IntentMatch("latest")
+
+
+def _contains_any(text: str, keywords: tuple[str, ...]) -> bool:
+    # A plain loop; any() over a generator costs more than the substring checks themselves.
+    for keyword in keywords:
+        if keyword in text:
+            return True
+    return False
+
+
+def topic_keywords(topic: str) -> tuple[str, ...]:
+    return dict(_TOPIC_RULES).get(topic, ())
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().translate(_NORMALIZE_TABLE).split())
+
+
+def find_flight_number(text: str) -> str:
+    if not _DIGIT.search(text):
+        return ""
+    upper = text.upper().replace("–", "-").replace("—", "-").replace("‑", "-")
+    pos = 0
+    while True:
+        match = _FLIGHT_PATTERN.search(upper, pos)
+        if match is None:
+            return ""
+        start = match.start()
+        if start == 0 or not _WORD_CHAR.match(upper, start - 1):
+            return match.group(1)
+        pos = start + 1
+
+
+def match_intent(text: str) -> IntentMatch | None:
+    """Resolve intent, flight number and info topic from the rule table, or None to defer to the LLM."""
+    normalized = normalize_text(text)
+    info_topic = ""
+    for topic, keyword in _TOPIC_KEYWORDS:
+        if keyword in normalized:
+            info_topic = topic
+            break
+
+    flight_number = find_flight_number(text)
+    if flight_number:
+        if info_topic:
+            return IntentMatch("flight_info", flight_number, info_topic)
+        return IntentMatch("flight", flight_number)
+
+    phrases: set[str | None] = set()
+    for trigger in _PHRASE_TRIGGERS:
+        if trigger in normalized:
+            phrases = {match.lastgroup for match in _PHRASE_PATTERN.finditer(normalized)}
+            break
+    if "all" in phrases:
+        return _ALL
+    if "latest" in phrases or _contains_any(normalized, _LATEST_KEYWORDS):
+        return _LATEST
+    if _contains_any(normalized, _ALL_KEYWORDS):
+        return _ALL
+    if info_topic:
+        return IntentMatch("flight_info", info_topic=info_topic)
+    if _contains_any(text.lower(), _LOOKUP_KEYWORDS):
+        return _LATEST
+    return None
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+import os
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.intent import normalize_text
+
+
+# Messages the rules miss go to classify_intent, and rephrasings of the same question
+# ("where am I headed" / "where am i heading") keep paying for that call. This keeps the
+# last INTENT_CACHE_SIZE classifications and answers a new message from the most similar
+# one when their cosine similarity reaches INTENT_CACHE_THRESHOLD. Messages are compared
+# as TF-IDF vectors over character trigrams, so no model or external service is needed.
+# An entry's vector is weighted with the document frequencies at the time it was stored;
+# the query uses the current ones. Classifications that carry a flight number are not
+# cached: the number belongs to that message, not to the question.
+
+_NGRAM = 3
+
+
+def _ngrams(normalized: str) -> Counter:
+    padded = f" {normalized} "
+    return Counter(padded[i:i + _NGRAM] for i in range(len(padded) - _NGRAM + 1))
+
+
+@dataclass
+class _Entry:
+    intent: str
+    vector: dict[str, float]
+
+
+class SemanticIntentCache:
+    """Bounded LRU of intent classifications, looked up by nearest neighbour."""
+
+    def __init__(self, maxsize: int, threshold: float) -> None:
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+        self._df: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _idf(self, gram: str) -> float:
+        # Smoothed, so a trigram in every entry still counts for a little.
+        return math.log((1 + len(self._entries)) / (1 + self._df[gram])) + 1
+
+    def _vector(self, grams: Counter) -> dict[str, float]:
+        weighted = {gram: (1 + math.log(count)) * self._idf(gram) for gram, count in grams.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weighted.values())) or 1.0
+        return {gram: weight / norm for gram, weight in weighted.items()}
+
+    def get(self, message: str) -> tuple[str, float] | None:
+        """(intent, similarity) of the closest cached message above the threshold, or None."""
+        key = normalize_text(message)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.exact_hits += 1
+            return entry.intent, 1.0
+        if not self._entries or not key:
+            self.misses += 1
+            return None
+        query = self._vector(_ngrams(key))
+        scores: dict[str, float] = {}
+        for gram, weight in query.items():
+            for candidate in self._postings.get(gram, ()):
+                candidate_weight = self._entries[candidate].vector[gram]
+                scores[candidate] = scores.get(candidate, 0.0) + weight * candidate_weight
+        best = max(scores, key=scores.__getitem__, default=None)
+        if best is None or scores[best] < self.threshold:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(best)
+        self.hits += 1
+        return self._entries[best].intent, scores[best]
+
+    def set(self, message: str, intent: str) -> None:
+        key = normalize_text(message)
+        if self.maxsize <= 0 or not key:
+            return
+        if key in self._entries:
+            self._remove(key)
+        grams = _ngrams(key)
+        self._df.update(grams.keys())
+        self._entries[key] = _Entry(intent, self._vector(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._postings.clear()
+        self._df.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for gram in entry.vector:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+            self._df[gram] -= 1
+            if self._df[gram] <= 0:
+                del self._df[gram]
+
+
+@lru_cache(maxsize=1)
+def _cache() -> SemanticIntentCache:
+    return SemanticIntentCache(
+        maxsize=int(os.getenv("INTENT_CACHE_SIZE", "2048")),
+        threshold=float(os.getenv("INTENT_CACHE_THRESHOLD", "0.8")),
+    )
+
+
+def lookup(message: str) -> tuple[str, float] | None:
+    return _cache().get(message)
+
+
+def remember(message: str, intent: str, flight_number: str = "") -> None:
+    if flight_number:
+        return
+    _cache().set(message, intent)
+
+
+def stats() -> dict[str, Any]:
+    return _cache().stats()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+from passlib.context import CryptContext
+
+
+# Password hashing runs on its own small thread pool, away from the event loop and from
+# the Mongo pool. passlib's pbkdf2 uses hashlib, which releases the GIL, so threads hash in
+# parallel without the pickling and start-up cost of a process pool. At most
+# KDF_POOL_SIZE hashes run at once and KDF_QUEUE_SIZE more may wait; past that, callers get
+# KdfPoolFullError straight away instead of queueing behind a login burst.
+_PWD_CONTEXT = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+T = TypeVar("T")
+
+
+class KdfPoolFullError(RuntimeError):
+    """Raised when the password-hashing pool and its queue are both full."""
+
+
+_LOCK = threading.Lock()
+_STATS = {
+    "pending": 0,
+    "completed": 0,
+    "rejected": 0,
+    "hash_seconds": 0.0,
+    "max_hash_seconds": 0.0,
+    "wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+
+def _pool_size() -> int:
+    return int(os.getenv("KDF_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+
+
+def _queue_size() -> int:
+    return int(os.getenv("KDF_QUEUE_SIZE", "32"))
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=_pool_size(), thread_name_prefix="kdf")
+
+
+def _timed(fn: Callable[..., T], submitted: float, *args: Any) -> T:
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        finished = time.perf_counter()
+        with _LOCK:
+            # Counted here, not in the awaiting coroutine, so a cancelled login still
+            # holds its slot until the hash it started has finished.
+            _STATS["pending"] -= 1
+            _STATS["completed"] += 1
+            _STATS["hash_seconds"] += finished - started
+            _STATS["max_hash_seconds"] = max(_STATS["max_hash_seconds"], finished - started)
+            _STATS["wait_seconds"] += started - submitted
+            _STATS["max_wait_seconds"] = max(_STATS["max_wait_seconds"], started - submitted)
+
+
+async def _run(fn: Callable[..., T], *args: Any) -> T:
+    with _LOCK:
+        if _STATS["pending"] >= _pool_size() + _queue_size():
+            _STATS["rejected"] += 1
+            raise KdfPoolFullError("Password hashing is at capacity")
+        _STATS["pending"] += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), _timed, fn, time.perf_counter(), *args)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_PWD_CONTEXT.hash, password)
+
+
+async def verify_password(plain_password: str, password_hash: str) -> bool:
+    return await _run(_PWD_CONTEXT.verify, plain_password, password_hash)
+
+
+def stats() -> dict[str, Any]:
+    with _LOCK:
+        snapshot = dict(_STATS)
+    completed = snapshot.pop("completed")
+    pending = snapshot.pop("pending")
+    workers = _pool_size()
+    return {
+        "workers": workers,
+        "queue_size": _queue_size(),
+        "in_flight": min(pending, workers),
+        "queued": max(pending - workers, 0),
+        "completed": completed,
+        "rejected": snapshot["rejected"],
+        "avg_hash_ms": round(snapshot["hash_seconds"] / completed * 1000, 2) if completed else 0.0,
+        "max_hash_ms": round(snapshot["max_hash_seconds"] * 1000, 2),
+        "avg_wait_ms": round(snapshot["wait_seconds"] / completed * 1000, 2) if completed else 0.0,
+        "max_wait_ms": round(snapshot["max_wait_seconds"] * 1000, 2),
+    }
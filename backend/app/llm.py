@@ -1,11 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
+import time
 from functools import lru_cache
 
-from groq import Groq
+from groq import APIError, AsyncGroq
+from langgraph.config import get_stream_writer
 import json
 
+from app.cache import TTLCache
+from app.metrics import LLM_CALL_SECONDS, LLM_TOKENS
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+class LLMTimeoutError(LLMError):
+    pass
+
 
 def _require_env(name: str) -> str:
     value = os.getenv(name)
@@ -15,24 +30,125 @@ def _require_env(name: str) -> str:
 
 
 @lru_cache(maxsize=1)
-def _client() -> Groq:
-    return Groq(api_key=_require_env("GROQ_API_KEY"))
+def _client() -> AsyncGroq:
+    return AsyncGroq(api_key=_require_env("GROQ_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def _semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+
+@lru_cache(maxsize=1)
+def _response_cache() -> TTLCache:
+    return TTLCache(
+        maxsize=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+    )
 
 
 def _model_name() -> str:
     return os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
 
-def chat_completion(messages: list[dict[str, str]]) -> str:
-    response = _client().chat.completions.create(
-        model=_model_name(),
-        messages=messages,
-        temperature=0.3,
-    )
-    return response.choices[0].message.content or ""
+def _timeout_seconds() -> float:
+    return float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+
+
+def _token_writer():
+    # Inside a graph run streamed with stream_mode="custom" this forwards tokens to the
+    # client; in any other graph run it is a no-op, and outside a run there is no config.
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _chunk: None
+
+
+def _record_usage(helper: str, model: str, usage) -> None:
+    if usage is None:
+        return
+    LLM_TOKENS.inc(helper, model, "prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.inc(helper, model, "completion", amount=getattr(usage, "completion_tokens", 0) or 0)
+
+
+async def _create_completion(messages: list[dict[str, str]], stream: bool, helper: str) -> str:
+    model = _model_name()
+    async with _semaphore():
+        if not stream:
+            response = await _client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.3,
+            )
+            _record_usage(helper, model, getattr(response, "usage", None))
+            return response.choices[0].message.content or ""
+        write = _token_writer()
+        parts: list[str] = []
+        chunks = await _client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.3,
+            stream=True,
+        )
+        async for chunk in chunks:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                write({"token": delta})
+            # Groq reports usage for a stream on its last chunk, under x_groq.
+            _record_usage(helper, model, getattr(getattr(chunk, "x_groq", None), "usage", None))
+        return "".join(parts)
+
+
+async def chat_completion(messages: list[dict[str, str]], stream: bool = False, helper: str = "agent") -> str:
+    # The timeout covers waiting for a concurrency slot as well as the call itself.
+    # Cancelling the caller (e.g. on client disconnect) cancels the in-flight request.
+    started = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        content = await asyncio.wait_for(_create_completion(messages, stream, helper), timeout=_timeout_seconds())
+        outcome = "ok"
+        return content
+    except asyncio.TimeoutError as exc:
+        outcome = "timeout"
+        raise LLMTimeoutError(f"LLM call exceeded {_timeout_seconds()}s") from exc
+    except APIError as exc:
+        outcome = "error"
+        raise LLMError(str(exc)) from exc
+    finally:
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started, helper, _model_name(), outcome)
+
+
+def _cache_key(messages: list[dict[str, str]]) -> str:
+    normalized = "\n".join(f"{m['role']}:{' '.join(m['content'].split()).casefold()}" for m in messages)
+    return hashlib.sha256(f"{_model_name()}\n{normalized}".encode()).hexdigest()
 
 
-def booking_response(booking: dict[str, str]) -> str:
+async def _cached_completion(messages: list[dict[str, str]], tags: tuple[str, ...], helper: str) -> str:
+    key = _cache_key(messages)
+    cached = _response_cache().get(key)
+    if cached is not None:
+        _token_writer()({"token": cached})
+        return cached
+    content = await chat_completion(messages, stream=True, helper=helper)
+    if content:
+        _response_cache().set(key, content, tags=tags)
+    return content
+
+
+def invalidate_booking_responses(booking_id: str) -> None:
+    _response_cache().invalidate_tag(f"booking:{booking_id}")
+
+
+def invalidate_flight_info_responses(flight_number: str) -> None:
+    _response_cache().invalidate_tag(f"flight_info:{flight_number}")
+
+
+def response_cache_stats() -> dict:
+    return _response_cache().stats()
+
+
+async def booking_response(booking: dict[str, str]) -> str:
     system_prompt = (
         "You are a secure booking assistant. Use ONLY the booking data provided. "
         "Respond in one short sentence. Do not invent details."
@@ -46,25 +162,28 @@ def booking_response(booking: dict[str, str]) -> str:
         f"Status: {booking.get('status', '')}\n"
         "Reply to the user."
     )
-    return chat_completion(
+    return await _cached_completion(
         [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
-        ]
+        ],
+        tags=(f"booking:{booking.get('booking_id', '')}",),
+        helper="booking_response",
     )
 
 
-def classify_intent(message: str) -> dict[str, str]:
+async def classify_intent(message: str) -> dict[str, str]:
     system_prompt = (
         "Classify user intent for a booking assistant. "
         "Return JSON with keys: intent (one of latest, all, flight, flight_info, unknown) and flight_number. "
         "Only include a flight_number if explicitly mentioned (e.g., AI-123)."
     )
-    raw = chat_completion(
+    raw = await chat_completion(
         [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": message},
-        ]
+        ],
+        helper="classify_intent",
     )
     try:
         data = json.loads(raw)
@@ -79,7 +198,7 @@ def classify_intent(message: str) -> dict[str, str]:
     return {"intent": intent, "flight_number": flight_number}
 
 
-def flight_info_response(details_text: str, question: str) -> str:
+async def flight_info_response(details_text: str, question: str, flight_number: str = "") -> str:
     system_prompt = (
         "You are a secure booking assistant. Use ONLY the flight info provided. "
         "Answer the user's question in one or two short sentences. Do not invent details."
@@ -90,9 +209,31 @@ def flight_info_response(details_text: str, question: str) -> str:
         f"User question: {question}\n"
         "Answer based only on the document."
     )
-    return chat_completion(
+    return await _cached_completion(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        tags=(f"flight_info:{flight_number}",),
+        helper="flight_info_response",
+    )
+
+
+async def summarize_conversation(previous_summary: str, messages: list[dict[str, str]]) -> str:
+    system_prompt = (
+        "You maintain a running summary of a conversation with a booking assistant. "
+        "Merge the new messages into the existing summary. Keep names, flight numbers, dates and "
+        "preferences the user shared. Reply with the updated summary only, in at most five sentences."
+    )
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    user_prompt = (
+        f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}"
+    )
+    return await chat_completion(
         [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
-        ]
+        ],
+        helper="summarize_conversation",
     )
@@ -1,18 +1,39 @@
-from fastapi import FastAPI, HTTPException, Request, status
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, field_validator
 from dotenv import load_dotenv
 from pathlib import Path
 
 from app.auth import (
-    AuthResult,
+    bearer_token,
     create_refresh_token,
     create_token,
-    decode_bearer_token,
+    decode_access_token,
     decode_refresh_token,
+    token_cache_stats,
 )
 import app.graph as graph_module
+from app import booking_cache, chat_threads, http_client, intent_cache, kdf, metrics, repository, revocation
+from app.chat_threads import ChatOverloadedError, ThreadBusyError
+from app.dates import booking_date_fields, parse_iso_datetime
+from app.flight_facts import answer_stats, extract_flight_facts
+from app.indexes import ensure_indexes
+from app.retrieval import index_flight_info
+from app.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.services import booking_payload
+from app.llm import invalidate_booking_responses, invalidate_flight_info_responses, response_cache_stats
+from app.kdf import KdfPoolFullError
 from app.users import ensure_demo_user, get_user_by_username, verify_password
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
@@ -24,10 +45,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Chat-Session"],
 )
 
 graph = graph_module.build_graph()
-_REVOKED_REFRESH_TOKENS: set[str] = set()
+_DISCONNECT_POLL_SECONDS = float(os.getenv("CHAT_DISCONNECT_POLL_SECONDS", "0.25"))
+_MAX_PAGE_SIZE = 100
+_CHAT_SESSION_COOKIE = "chat_session"
+_CHAT_SESSION_HEADER = "X-Chat-Session"
+_CHAT_SESSION_MAX_AGE = 30 * 24 * 3600
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+
+BookingRange = Literal["upcoming", "past"]
 
 
 class ChatRequest(BaseModel):
@@ -56,21 +85,18 @@ class BookingCreateRequest(BaseModel):
     flight_number: str
     origin: str
     destination: str
-    date: str
+    date: datetime
     status: str
 
-    @field_validator("date")
+    @field_validator("date", mode="before")
     @classmethod
-    def validate_date(cls, value: str) -> str:
-        from datetime import datetime
-
+    def validate_date(cls, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
         try:
-            if value.endswith("Z"):
-                value = value[:-1] + "+00:00"
-            datetime.fromisoformat(value)
+            return parse_iso_datetime(value)
         except ValueError as exc:
             raise ValueError("date must be ISO 8601 (e.g. 2026-04-01T09:30:00Z)") from exc
-        return value
 
 
 class BookingCreateResponse(BaseModel):
@@ -84,43 +110,129 @@ class BookingResponse(BaseModel):
     origin: str
     destination: str
     date: str
+    date_display: str
     status: str
 
 
+class BookingCountResponse(BaseModel):
+    total: int
+
+
+@dataclass(frozen=True)
+class Caller:
+    user_id: str | None
+    is_authenticated: bool
+    access_token: str | None
+
+
 class FlightInfoResponse(BaseModel):
     flight_number: str
     details_text: str
+    facts: dict[str, Any] = {}
+
+
+_SEED_BOOKINGS = [
+    {
+        "_id": "booking_101",
+        "user_id": "user_123",
+        "flight_number": "AI-888",
+        "origin": "Pune",
+        "destination": "Delhi",
+        **booking_date_fields("2026-03-10T14:00:00Z"),
+        "status": "Confirmed",
+    },
+]
+
+_SEED_FLIGHT_INFO = [
+    {
+        "flight_number": "AI-888",
+        "details_text": (
+            "Flight AI-888 uses an Airbus A320. Complimentary snack and beverage are provided. "
+            "Baggage allowance is 15kg checked and 7kg cabin. Wi-Fi is not available. "
+            "Seat pitch is 30 in. USB charging is available on select rows."
+        ),
+    },
+    {
+        "flight_number": "AI-999",
+        "details_text": (
+            "Flight AI-999 uses a Boeing 737-8. Complimentary meal for flights over 2 hours. "
+            "Baggage allowance is 20kg checked and 7kg cabin. Wi-Fi is available (paid). "
+            "Seat pitch is 31 in. Exit rows offer extra legroom."
+        ),
+    },
+]
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "checkpointer": graph_module.CHECKPOINTER_KIND}
+    return {
+        "status": "ok",
+        "checkpointer": graph_module.CHECKPOINTER_KIND,
+        "checkpoint_db": await graph_module.checkpoint_stats(),
+        "tool_http": http_client.pool_stats(),
+        "llm_cache": response_cache_stats(),
+        "booking_cache": booking_cache.stats(),
+        "flight_info_answers": answer_stats(),
+        "revoked_tokens": revocation.stats(),
+        "kdf": kdf.stats(),
+        "auth_cache": token_cache_stats(),
+        "chat": chat_threads.stats(),
+        "intent_cache": intent_cache.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    # Prometheus text format. Per worker process: scrape each worker, or sum in the query.
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.on_event("startup")
 async def startup():
-    ensure_demo_user()
+    if os.getenv("MONGODB_ENSURE_INDEXES", "1") == "1":
+        await ensure_indexes()
+    await ensure_demo_user()
+    await http_client.startup()
+    await graph_module.start_checkpoint_maintenance()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await graph_module.stop_checkpoint_maintenance()
+    await http_client.shutdown()
+
+
+# Auth is declared per route: only handlers that depend on optional_caller or current_caller
+# read the Authorization header, so /health, /login, /refresh and /seed skip it entirely.
+# Both are async so FastAPI runs them inline rather than on its thread pool.
+async def optional_caller(authorization: str | None = Header(None)) -> Caller:
+    token = bearer_token(authorization)
+    auth = decode_access_token(token)
+    return Caller(
+        user_id=auth.user_id,
+        is_authenticated=auth.is_authenticated,
+        access_token=token if auth.is_authenticated else None,
+    )
 
 
-@app.middleware("http")
-async def auth_middleware(request: Request, call_next):
-    auth_header = request.headers.get("Authorization")
-    auth: AuthResult = decode_bearer_token(auth_header)
-    request.state.user_id = auth.user_id
-    request.state.is_authenticated = auth.is_authenticated
-    access_token = None
-    if auth_header:
-        parts = auth_header.split()
-        if len(parts) == 2 and parts[0].lower() == "bearer":
-            access_token = parts[1]
-    request.state.access_token = access_token
-    return await call_next(request)
+async def current_caller(caller: Caller = Depends(optional_caller)) -> Caller:
+    if not caller.is_authenticated:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    return caller
 
 
 @app.post("/login")
 async def login(req: LoginRequest):
-    user = get_user_by_username(req.username)
-    if not user or not verify_password(req.password, user.password_hash):
+    user = await get_user_by_username(req.username)
+    try:
+        verified = bool(user) and await verify_password(req.password, user.password_hash)
+    except KdfPoolFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     access_token = create_token(user.user_id)
     refresh_token = create_refresh_token(user.user_id)
@@ -136,9 +248,9 @@ async def refresh(req: RefreshRequest):
     auth = decode_refresh_token(req.refresh_token)
     if not auth.is_authenticated or not auth.user_id or not auth.token_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    if auth.token_id in _REVOKED_REFRESH_TOKENS:
+    # Each refresh token is single-use: revoking it is how we check it was not used already.
+    if not await revocation.revoke(auth.token_id, auth.expires_at):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
-    _REVOKED_REFRESH_TOKENS.add(auth.token_id)
     access_token = create_token(auth.user_id)
     refresh_token = create_refresh_token(auth.user_id)
     return {
@@ -153,7 +265,7 @@ async def logout(req: LogoutRequest):
     auth = decode_refresh_token(req.refresh_token)
     if not auth.is_authenticated or not auth.token_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    _REVOKED_REFRESH_TOKENS.add(auth.token_id)
+    await revocation.revoke(auth.token_id, auth.expires_at)
     if auth.user_id:
         await graph_module.clear_checkpoint(auth.user_id)
     return {"status": "ok"}
@@ -161,179 +273,238 @@ async def logout(req: LogoutRequest):
 
 @app.post("/seed", response_model=SeedResponse)
 async def seed():
-    ensure_demo_user()
-    from app.db import get_bookings_collection
-    from app.db import get_flight_info_collection
-
-    bookings = get_bookings_collection()
-    existing = bookings.find_one({"_id": "booking_101"})
-    if not existing:
-        bookings.insert_one(
-            {
-                "_id": "booking_101",
-                "user_id": "user_123",
-                "flight_number": "AI-888",
-                "origin": "Pune",
-                "destination": "Delhi",
-                "date": "2026-03-10T14:00:00Z",
-                "status": "Confirmed",
-            }
-        )
-    flight_info = get_flight_info_collection()
-    if not flight_info.find_one({"flight_number": "AI-888"}):
-        flight_info.insert_one(
-            {
-                "flight_number": "AI-888",
-                "details_text": (
-                    "Flight AI-888 uses an Airbus A320. Complimentary snack and beverage are provided. "
-                    "Baggage allowance is 15kg checked and 7kg cabin. Wi-Fi is not available. "
-                    "Seat pitch is 30 in. USB charging is available on select rows."
-                ),
-            }
-        )
-    if not flight_info.find_one({"flight_number": "AI-999"}):
-        flight_info.insert_one(
-            {
-                "flight_number": "AI-999",
-                "details_text": (
-                    "Flight AI-999 uses a Boeing 737-8. Complimentary meal for flights over 2 hours. "
-                    "Baggage allowance is 20kg checked and 7kg cabin. Wi-Fi is available (paid). "
-                    "Seat pitch is 31 in. Exit rows offer extra legroom."
-                ),
-            }
+    try:
+        await ensure_demo_user()
+    except KdfPoolFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password hashes in progress, retry shortly",
+            headers={"Retry-After": "1"},
         )
+    for booking in _SEED_BOOKINGS:
+        await repository.ensure_booking(booking)
+        invalidate_booking_responses(booking["_id"])
+    for user_id in {booking["user_id"] for booking in _SEED_BOOKINGS}:
+        await booking_cache.invalidate_user(user_id)
+    for info in _SEED_FLIGHT_INFO:
+        await repository.ensure_flight_info({**info, "facts": extract_flight_facts(info["details_text"])})
+        index_flight_info(info["flight_number"], info["details_text"])
+        invalidate_flight_info_responses(info["flight_number"])
     return {"status": "seeded"}
 
 
 @app.post("/bookings", response_model=BookingCreateResponse)
-async def create_booking(req: BookingCreateRequest, request: Request):
-    if not request.state.is_authenticated:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
-    if req.user_id != request.state.user_id:
+async def create_booking(req: BookingCreateRequest, caller: Caller = Depends(current_caller)):
+    if req.user_id != caller.user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot create booking for another user")
-    from app.db import get_bookings_collection
-
     booking = {
         "user_id": req.user_id,
         "flight_number": req.flight_number,
         "origin": req.origin,
         "destination": req.destination,
-        "date": req.date,
+        **booking_date_fields(req.date),
         "status": req.status,
     }
-    result = get_bookings_collection().insert_one(booking)
-    return {"booking_id": str(result.inserted_id)}
+    booking_id = await repository.insert_booking(booking)
+    await booking_cache.invalidate_user(req.user_id)
+    return {"booking_id": booking_id}
 
 
 @app.get("/bookings", response_model=list[BookingResponse])
 async def list_bookings(
-    request: Request,
+    caller: Caller = Depends(current_caller),
     origin: str | None = None,
     destination: str | None = None,
-    status: str | None = None,
+    status_filter: str | None = Query(None, alias="status"),
+    when: BookingRange | None = None,
+    limit: int | None = Query(None, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    with_total: bool = False,
 ):
-    if not request.state.is_authenticated:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
-    user_id = request.state.user_id
-    from app.db import get_bookings_collection
-
-    query: dict[str, str] = {"user_id": user_id}
-    if origin:
-        query["origin"] = origin
-    if destination:
-        query["destination"] = destination
-    if status:
-        query["status"] = status
-    cursor = get_bookings_collection().find(query).sort("date", -1)
-    results: list[BookingResponse] = []
-    for doc in cursor:
-        results.append(
-            BookingResponse(
-                booking_id=str(doc.get("_id")),
-                user_id=str(doc.get("user_id", "")),
-                flight_number=str(doc.get("flight_number", "")),
-                origin=str(doc.get("origin", "")),
-                destination=str(doc.get("destination", "")),
-                date=str(doc.get("date", "")),
-                status=str(doc.get("status", "")),
-            )
+    """Bookings newest first (soonest first for `when=upcoming`).
+
+    Pass `limit` to page; `X-Next-Cursor` is set while more remain.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    filters = {"origin": origin, "destination": destination, "status": status_filter, "when": when}
+    # One extra row tells us whether there is a next page without a count.
+    docs = await booking_cache.find_bookings(
+        caller.user_id, **filters, limit=limit + 1 if limit else 0, after=after
+    )
+    headers: dict[str, str] = {}
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1].get("date"), docs[-1]["_id"])
+    if with_total:
+        headers["X-Total-Count"] = str(
+            await booking_cache.count_bookings(caller.user_id, **filters)
         )
-    return results
+    # Every field is already a str, so the mapped dicts are encoded as-is instead of being
+    # rebuilt as models and validated again by response_model.
+    return ORJSONResponse([booking_payload(doc) for doc in docs], headers=headers)
+
+
+@app.get("/bookings/count", response_model=BookingCountResponse)
+async def count_bookings(
+    caller: Caller = Depends(current_caller),
+    origin: str | None = None,
+    destination: str | None = None,
+    status_filter: str | None = Query(None, alias="status"),
+    when: BookingRange | None = None,
+):
+    total = await booking_cache.count_bookings(
+        caller.user_id, origin=origin, destination=destination, status=status_filter, when=when
+    )
+    return {"total": total}
 
 
 @app.get("/bookings/latest", response_model=BookingResponse)
-async def latest_booking(request: Request):
-    if not request.state.is_authenticated:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+async def latest_booking(caller: Caller = Depends(current_caller)):
     from app.tools import get_latest_booking_db
 
-    booking = get_latest_booking_db(request.state.user_id or "")
+    booking = await get_latest_booking_db(caller.user_id or "")
     if not booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No booking found")
-    return BookingResponse(
-        booking_id=str(booking.get("_id")),
-        user_id=str(booking.get("user_id", "")),
-        flight_number=str(booking.get("flight_number", "")),
-        origin=str(booking.get("origin", "")),
-        destination=str(booking.get("destination", "")),
-        date=str(booking.get("date", "")),
-        status=str(booking.get("status", "")),
-    )
+    return booking_payload(booking)
 
 
 @app.get("/bookings/flight/{flight_number}", response_model=BookingResponse)
-async def booking_by_flight(flight_number: str, request: Request):
-    if not request.state.is_authenticated:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
-    from app.db import get_bookings_collection
-
-    booking = get_bookings_collection().find_one(
-        {"user_id": request.state.user_id, "flight_number": flight_number}
-    )
+async def booking_by_flight(flight_number: str, caller: Caller = Depends(current_caller)):
+    booking = await booking_cache.find_booking_by_flight(caller.user_id, flight_number)
     if not booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No booking found")
-    return BookingResponse(
-        booking_id=str(booking.get("_id")),
-        user_id=str(booking.get("user_id", "")),
-        flight_number=str(booking.get("flight_number", "")),
-        origin=str(booking.get("origin", "")),
-        destination=str(booking.get("destination", "")),
-        date=str(booking.get("date", "")),
-        status=str(booking.get("status", "")),
-    )
+    return booking_payload(booking)
 
 
 @app.get("/flight-info/{flight_number}", response_model=FlightInfoResponse)
-async def flight_info(flight_number: str, request: Request):
-    if not request.state.is_authenticated:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
-    from app.db import get_flight_info_collection
-
-    info = get_flight_info_collection().find_one({"flight_number": flight_number})
+async def flight_info(flight_number: str, caller: Caller = Depends(current_caller)):
+    info = await repository.find_flight_info(flight_number)
     if not info:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No flight info found")
     return FlightInfoResponse(
         flight_number=str(info.get("flight_number", "")),
         details_text=str(info.get("details_text", "")),
+        facts=info.get("facts") or {},
     )
 
 
-@app.post("/chat")
-async def chat(req: ChatRequest, request: Request):
-    state = {
+def _chat_state(req: ChatRequest, caller: Caller) -> dict:
+    return {
         "messages": [HumanMessage(content=req.message)],
-        "user_id": request.state.user_id or "",
-        "is_authenticated": bool(request.state.is_authenticated),
-        "access_token": request.state.access_token or "",
+        "user_id": caller.user_id or "",
+        "is_authenticated": caller.is_authenticated,
+        "access_token": caller.access_token or "",
         "intent": "unknown",
         "flight_number": "",
         "info_topic": "",
     }
-    thread_id = request.state.user_id or "anon"
-    result = await graph.ainvoke(
-        state,
-        config={"configurable": {"thread_id": thread_id}},
+
+
+def _chat_thread(caller: Caller, request: Request) -> tuple[str, str | None]:
+    """Checkpoint thread for this caller, plus the anonymous session id to send back, if any.
+
+    Signed-in users keep one thread per user. Anonymous callers each get their own thread,
+    tied to a session id the client sends back in the X-Chat-Session header. The frontend
+    is served from another origin, where a cookie would not come back, so the header comes
+    first; the chat_session cookie still works for same-site clients.
+    """
+    if caller.user_id:
+        return caller.user_id, None
+    for session in (request.headers.get(_CHAT_SESSION_HEADER, ""), request.cookies.get(_CHAT_SESSION_COOKIE, "")):
+        if _SESSION_ID.fullmatch(session):
+            return f"anon:{session}", session
+    session = uuid4().hex
+    return f"anon:{session}", session
+
+
+def _chat_session_headers(session: str | None) -> dict[str, str]:
+    return {_CHAT_SESSION_HEADER: session} if session else {}
+
+
+def _set_chat_session(response: Response, session: str | None) -> None:
+    if not session:
+        return
+    response.headers[_CHAT_SESSION_HEADER] = session
+    response.set_cookie(
+        _CHAT_SESSION_COOKIE, session, max_age=_CHAT_SESSION_MAX_AGE, httponly=True, samesite="lax"
     )
-    messages = result.get("messages", [])
-    content = messages[-1].content if messages else ""
+
+
+def _chat_refused(exc: RuntimeError, session: str | None = None) -> HTTPException:
+    # 429: this conversation is sending too fast. 503: the whole worker is at capacity.
+    if isinstance(exc, ThreadBusyError):
+        code = status.HTTP_429_TOO_MANY_REQUESTS
+    else:
+        code = status.HTTP_503_SERVICE_UNAVAILABLE
+    headers = {"Retry-After": "1", **_chat_session_headers(session)}
+    return HTTPException(status_code=code, detail=str(exc), headers=headers)
+
+
+def _chat_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@app.post("/chat")
+async def chat(
+    req: ChatRequest, request: Request, response: Response, caller: Caller = Depends(optional_caller)
+):
+    thread_id, session = _chat_thread(caller, request)
+    _set_chat_session(response, session)
+    config = _chat_config(thread_id)
+
+    async def run_graph() -> str:
+        result = await graph.ainvoke(_chat_state(req, caller), config=config)
+        graph_module.schedule_summary(graph, config)
+        messages = result.get("messages", [])
+        return messages[-1].content if messages else ""
+
+    # One turn at a time per thread; a duplicate of a message still in flight shares its reply.
+    run = asyncio.ensure_future(chat_threads.run_turn(thread_id, req.message, run_graph))
+    # Stop the graph (and any in-flight LLM call) as soon as the client goes away.
+    while True:
+        done, _ = await asyncio.wait({run}, timeout=_DISCONNECT_POLL_SECONDS)
+        if done:
+            break
+        if await request.is_disconnected():
+            run.cancel()
+            return Response(status_code=499)
+    try:
+        content = run.result()
+    except (ThreadBusyError, ChatOverloadedError) as exc:
+        raise _chat_refused(exc, session) from exc
     return {"reply": content}
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest, request: Request, caller: Caller = Depends(optional_caller)):
+    thread_id, session = _chat_thread(caller, request)
+    try:
+        chat_threads.check_capacity(thread_id)
+    except (ThreadBusyError, ChatOverloadedError) as exc:
+        raise _chat_refused(exc, session) from exc
+    config = _chat_config(thread_id)
+
+    async def events():
+        # Flush headers and a first byte right away; time-to-first-byte is what users notice.
+        yield "event: start\ndata: {}\n\n"
+        try:
+            async with chat_threads.turn(thread_id):
+                async for event, data in graph_module.stream_turn(graph, _chat_state(req, caller), config):
+                    yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                graph_module.schedule_summary(graph, config)
+        except (ThreadBusyError, ChatOverloadedError) as exc:
+            # Refused after the 200 went out (the limits filled up in between).
+            yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
+
+    response = StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    _set_chat_session(response, session)
+    return response
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable
+
+
+# Minimal Prometheus text-format metrics, kept in-process per worker. Recording is a dict
+# lookup plus a bisect, a microsecond or so, so it can sit on every node, LLM call and
+# Mongo operation. Label values are passed positionally in `labelnames` order.
+
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        _REGISTRY.append(self)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last), sum]. Buckets are cumulated on render.
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+        _REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _number(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*labels, le))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+_REGISTRY: list[Counter | Histogram] = []
+
+GRAPH_NODE_SECONDS = Histogram(
+    "graph_node_duration_seconds", "LangGraph node run time.", ("node", "outcome")
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds",
+    "chat_completion time, including the wait for a concurrency slot.",
+    ("helper", "model", "outcome"),
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the LLM API.", ("helper", "model", "kind"))
+MONGO_OP_SECONDS = Histogram(
+    "mongo_operation_duration_seconds", "Repository calls to MongoDB.", ("collection", "operation", "outcome")
+)
+TOOL_CALL_SECONDS = Histogram(
+    "tool_call_duration_seconds", "Agent tool calls, in-process or over HTTP.", ("tool", "mode", "outcome")
+)
+INTENT_ROUTES = Counter(
+    "intent_routes_total",
+    "How a message's intent was resolved: rules, cache, llm or llm_error.",
+    ("source", "intent"),
+)
+
+
+def timed_node(name: str, node: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+    """Wrap a graph node so each run lands in graph_node_duration_seconds."""
+
+    async def run(state: Any) -> Any:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await node(state)
+            outcome = "ok"
+            return result
+        finally:
+            GRAPH_NODE_SECONDS.observe(time.perf_counter() - started, name, outcome)
+
+    run.__name__ = getattr(node, "__name__", name)
+    return run
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,76 @@
+"""One-off data migrations. Each one is idempotent and safe to re-run.
+
+    python -m app.migrations
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from app import repository
+from app.dates import booking_date_fields
+from app.flight_facts import FACTS_VERSION, extract_flight_facts
+
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_booking_dates(batch_size: int = 500) -> dict[str, int]:
+    """Convert ISO-string booking dates to BSON datetimes and fill in `date_display`."""
+    collection = repository.bookings()
+    pending: dict[str, Any] = {"$or": [{"date": {"$type": "string"}}, {"date_display": {"$exists": False}}]}
+    skipped: list[Any] = []
+    migrated = 0
+    while True:
+        query = {**pending, "_id": {"$nin": skipped}} if skipped else pending
+        docs = await collection.find(query, projection={"date": 1}, limit=batch_size)
+        if not docs:
+            break
+        updates = []
+        for doc in docs:
+            try:
+                fields = booking_date_fields(doc["date"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Booking %s has no usable date: %r", doc["_id"], doc.get("date"))
+                skipped.append(doc["_id"])
+                continue
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+            migrated += len(updates)
+    return {"migrated": migrated, "skipped": len(skipped)}
+
+
+async def migrate_flight_facts(batch_size: int = 500) -> dict[str, int]:
+    """Extract structured facts for flight-info documents that have none, or older ones."""
+    collection = repository.flight_info()
+    migrated = 0
+    while True:
+        docs = await collection.find(
+            {"facts.version": {"$ne": FACTS_VERSION}}, projection={"details_text": 1}, limit=batch_size
+        )
+        if not docs:
+            break
+        updates = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"facts": extract_flight_facts(doc.get("details_text", ""))}})
+            for doc in docs
+        ]
+        await collection.bulk_write(updates, ordered=False)
+        migrated += len(docs)
+    return {"migrated": migrated}
+
+
+async def main() -> None:
+    load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
+    print("booking dates:", await migrate_booking_dates())
+    print("flight facts:", await migrate_flight_facts())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
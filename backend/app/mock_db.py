@@ -11,7 +11,7 @@ _BOOKINGS: list[dict[str, Any]] = [
         "flight_number": "AI-888",
         "origin": "Pune",
         "destination": "Delhi",
-        "date": "2026-03-10T14:00:00Z",
+        "date": datetime(2026, 3, 10, 14, 0, tzinfo=timezone.utc),
         "status": "Confirmed",
     },
     {
@@ -20,20 +20,14 @@ _BOOKINGS: list[dict[str, Any]] = [
         "flight_number": "AI-999",
         "origin": "Delhi",
         "destination": "Mumbai",
-        "date": "2026-04-01T09:30:00Z",
+        "date": datetime(2026, 4, 1, 9, 30, tzinfo=timezone.utc),
         "status": "Confirmed",
     },
 ]
 
 
-def _parse_iso(dt: str) -> datetime:
-    if dt.endswith("Z"):
-        dt = dt[:-1] + "+00:00"
-    return datetime.fromisoformat(dt).astimezone(timezone.utc)
-
-
 def find_latest_booking(user_id: str) -> dict[str, Any] | None:
     matches = [b for b in _BOOKINGS if b.get("user_id") == user_id]
     if not matches:
         return None
-    return max(matches, key=lambda b: _parse_iso(b["date"]))
+    return max(matches, key=lambda b: b["date"])
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app import repository
+from app.indexes import CHECKPOINT_INDEXES, ensure_indexes
+
+
+_WRITE_ORDER = [("task_id", ASCENDING), ("idx", ASCENDING)]
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver[int]):
+    """LangGraph checkpointer on the app's MongoDB, shareable across workers and hosts.
+
+    Every checkpoint and pending write is an upsert keyed by a unique index, so concurrent
+    writers never need a lock: replaying the same write is idempotent and distinct
+    checkpoints never collide. Reads go through the (thread_id, checkpoint_ns, checkpoint_id)
+    index, newest first.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.checkpoints = repository.checkpoints()
+        self.writes = repository.checkpoint_writes()
+        self.is_setup = False
+        self._setup_lock = asyncio.Lock()
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        async with self._setup_lock:
+            if self.is_setup:
+                return
+            await ensure_indexes(CHECKPOINT_INDEXES)
+            self.is_setup = True
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        await self.setup()
+        query = {
+            "thread_id": str(config["configurable"]["thread_id"]),
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+        }
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+        doc = await self.checkpoints.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        if doc is None:
+            return None
+        writes = await self.writes.find(
+            {
+                "thread_id": doc["thread_id"],
+                "checkpoint_ns": doc["checkpoint_ns"],
+                "checkpoint_id": doc["checkpoint_id"],
+            },
+            sort=_WRITE_ORDER,
+        )
+        return self._to_tuple(doc, writes)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self.setup()
+        query: dict[str, Any] = {}
+        if config is not None:
+            query["thread_id"] = str(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                query["checkpoint_ns"] = checkpoint_ns
+        checkpoint_ids: dict[str, str] = {}
+        if config is not None and (checkpoint_id := get_checkpoint_id(config)):
+            checkpoint_ids["$eq"] = checkpoint_id
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            checkpoint_ids["$lt"] = before_id
+        if checkpoint_ids:
+            query["checkpoint_id"] = checkpoint_ids
+        # Metadata is stored serialized, so a metadata filter is applied after the query
+        # and the limit has to follow it.
+        docs = await self.checkpoints.find(
+            query,
+            sort=[("checkpoint_id", DESCENDING)],
+            limit=0 if filter else (limit or 0),
+        )
+        if filter:
+            docs = [doc for doc in docs if _matches(self._load_metadata(doc), filter)]
+            if limit:
+                docs = docs[:limit]
+        if not docs:
+            return
+        pending: dict[tuple[str, str, str], list[dict[str, Any]]] = {}
+        for write in await self.writes.find(
+            {
+                "thread_id": {"$in": sorted({doc["thread_id"] for doc in docs})},
+                "checkpoint_id": {"$in": [doc["checkpoint_id"] for doc in docs]},
+            },
+            sort=_WRITE_ORDER,
+        ):
+            key = (write["thread_id"], write["checkpoint_ns"], write["checkpoint_id"])
+            pending.setdefault(key, []).append(write)
+        for doc in docs:
+            key = (doc["thread_id"], doc["checkpoint_ns"], doc["checkpoint_id"])
+            yield self._to_tuple(doc, pending.get(key, []))
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        key = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}
+        await self.checkpoints.update_one(
+            key,
+            {
+                "$set": {
+                    "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                    "type": type_,
+                    "checkpoint": serialized_checkpoint,
+                    "metadata_type": metadata_type,
+                    "metadata": serialized_metadata,
+                }
+            },
+            upsert=True,
+        )
+        return {"configurable": {**key}}
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if not writes:
+            return
+        await self.setup()
+        # Same semantics as the SQLite saver: special channels overwrite, regular writes
+        # keep the first value stored for a (task, idx) slot.
+        operator = "$set" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "$setOnInsert"
+        requests = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            key = {
+                "thread_id": str(config["configurable"]["thread_id"]),
+                "checkpoint_ns": str(config["configurable"]["checkpoint_ns"]),
+                "checkpoint_id": str(config["configurable"]["checkpoint_id"]),
+                "task_id": task_id,
+                "idx": WRITES_IDX_MAP.get(channel, idx),
+            }
+            fields = {"channel": channel, "type": type_, "value": serialized, "task_path": task_path}
+            requests.append(UpdateOne(key, {operator: fields}, upsert=True))
+        await self.writes.bulk_write(requests, ordered=False)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.setup()
+        await self.checkpoints.delete_many({"thread_id": str(thread_id)})
+        await self.writes.delete_many({"thread_id": str(thread_id)})
+
+    def _load_metadata(self, doc: dict[str, Any]) -> CheckpointMetadata:
+        if doc.get("metadata") is None:
+            return {}
+        return self.serde.loads_typed((doc["metadata_type"], doc["metadata"]))
+
+    def _to_tuple(self, doc: dict[str, Any], writes: list[dict[str, Any]]) -> CheckpointTuple:
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": doc["checkpoint_id"],
+                }
+            },
+            self.serde.loads_typed((doc["type"], doc["checkpoint"])),
+            self._load_metadata(doc),
+            (
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+            [
+                (write["task_id"], write["channel"], self.serde.loads_typed((write["type"], write["value"])))
+                for write in writes
+            ],
+        )
+
+
+def _matches(metadata: CheckpointMetadata, filter: dict[str, Any]) -> bool:
+    return all(metadata.get(key) == value for key, value in filter.items())
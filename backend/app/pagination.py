@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+# Keyset values keep their BSON type through the round trip: seeded bookings have string
+# _ids, API-created ones have ObjectIds, and Mongo only range-compares values of one type.
+def _encode_value(value: Any) -> list[str]:
+    if isinstance(value, ObjectId):
+        return ["o", str(value)]
+    if isinstance(value, datetime):
+        return ["t", value.isoformat()]
+    return ["s", str(value)]
+
+
+def _decode_value(tagged: Any) -> Any:
+    if not isinstance(tagged, list) or len(tagged) != 2 or not isinstance(tagged[1], str):
+        raise InvalidCursorError("Malformed cursor")
+    kind, raw = tagged
+    try:
+        if kind == "o":
+            return ObjectId(raw)
+        if kind == "t":
+            return datetime.fromisoformat(raw)
+    except (InvalidId, ValueError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if kind == "s":
+        return raw
+    raise InvalidCursorError("Malformed cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[Any, ...]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        tagged = json.loads(payload)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if not isinstance(tagged, list) or len(tagged) != size:
+        raise InvalidCursorError("Malformed cursor")
+    return tuple(_decode_value(item) for item in tagged)
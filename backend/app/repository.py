@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from typing import Any, Protocol
+
+from pymongo.errors import DuplicateKeyError
+
+from app.db import (
+    booking_versions_collection_name,
+    bookings_collection_name,
+    checkpoint_writes_collection_name,
+    checkpoints_collection_name,
+    flight_info_collection_name,
+    get_async_db,
+    get_db,
+    revoked_tokens_collection_name,
+    users_collection_name,
+)
+from app.metrics import MONGO_OP_SECONDS
+
+
+Sort = list[tuple[str, int]]
+
+# Fields the booking API and the agent read; everything else stays on the server.
+BOOKING_PROJECTION = {
+    "user_id": 1,
+    "flight_number": 1,
+    "origin": 1,
+    "destination": 1,
+    "date": 1,
+    "date_display": 1,
+    "status": 1,
+}
+# Newest first, with _id as the tie-breaker so (date, _id) is a total order for keyset paging.
+BOOKING_ORDER: Sort = [("date", -1), ("_id", -1)]
+# Upcoming bookings read soonest first: the same index, scanned the other way.
+UPCOMING_ORDER: Sort = [("date", 1), ("_id", 1)]
+
+
+class AsyncCollection(Protocol):
+    async def find_one(
+        self, filter: dict[str, Any], *, projection: dict[str, Any] | None = None, sort: Sort | None = None
+    ) -> dict[str, Any] | None: ...
+
+    async def find(
+        self,
+        filter: dict[str, Any],
+        *,
+        projection: dict[str, Any] | None = None,
+        sort: Sort | None = None,
+        limit: int = 0,
+    ) -> list[dict[str, Any]]: ...
+
+    async def count_documents(self, filter: dict[str, Any]) -> int: ...
+
+    async def insert_one(self, document: dict[str, Any]) -> Any: ...
+
+    async def update_one(self, filter: dict[str, Any], update: dict[str, Any], *, upsert: bool = False) -> Any: ...
+
+    async def bulk_write(self, requests: list[Any], *, ordered: bool = True) -> Any: ...
+
+    async def delete_many(self, filter: dict[str, Any]) -> Any: ...
+
+    async def create_index(self, keys: Sort, **kwargs: Any) -> str: ...
+
+
+class ThreadedCollection:
+    """Runs blocking pymongo calls on a dedicated executor instead of the event loop."""
+
+    def __init__(self, collection: Any, executor: ThreadPoolExecutor) -> None:
+        self._collection = collection
+        self._executor = executor
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def find_one(self, filter, *, projection=None, sort=None):
+        return await self._run(self._collection.find_one, filter, projection, sort=sort)
+
+    async def find(self, filter, *, projection=None, sort=None, limit=0):
+        def _query() -> list[dict[str, Any]]:
+            cursor = self._collection.find(filter, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+
+        return await self._run(_query)
+
+    async def count_documents(self, filter):
+        return await self._run(self._collection.count_documents, filter)
+
+    async def insert_one(self, document):
+        return await self._run(self._collection.insert_one, document)
+
+    async def update_one(self, filter, update, *, upsert=False):
+        return await self._run(self._collection.update_one, filter, update, upsert=upsert)
+
+    async def bulk_write(self, requests, *, ordered=True):
+        return await self._run(self._collection.bulk_write, requests, ordered=ordered)
+
+    async def delete_many(self, filter):
+        return await self._run(self._collection.delete_many, filter)
+
+    async def create_index(self, keys, **kwargs):
+        return await self._run(self._collection.create_index, keys, **kwargs)
+
+
+class MotorCollection:
+    """Thin adapter giving motor collections the same call shape as ThreadedCollection."""
+
+    def __init__(self, collection: Any) -> None:
+        self._collection = collection
+
+    async def find_one(self, filter, *, projection=None, sort=None):
+        return await self._collection.find_one(filter, projection, sort=sort)
+
+    async def find(self, filter, *, projection=None, sort=None, limit=0):
+        cursor = self._collection.find(filter, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def count_documents(self, filter):
+        return await self._collection.count_documents(filter)
+
+    async def insert_one(self, document):
+        return await self._collection.insert_one(document)
+
+    async def update_one(self, filter, update, *, upsert=False):
+        return await self._collection.update_one(filter, update, upsert=upsert)
+
+    async def bulk_write(self, requests, *, ordered=True):
+        return await self._collection.bulk_write(requests, ordered=ordered)
+
+    async def delete_many(self, filter):
+        return await self._collection.delete_many(filter)
+
+    async def create_index(self, keys, **kwargs):
+        return await self._collection.create_index(keys, **kwargs)
+
+
+class TimedCollection:
+    """Records each call's latency in mongo_operation_duration_seconds, whatever the driver."""
+
+    def __init__(self, collection: AsyncCollection, name: str) -> None:
+        self._collection = collection
+        self._name = name
+
+    async def _timed(self, operation: str, call):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call
+            outcome = "ok"
+            return result
+        finally:
+            MONGO_OP_SECONDS.observe(time.perf_counter() - started, self._name, operation, outcome)
+
+    async def find_one(self, filter, *, projection=None, sort=None):
+        return await self._timed("find_one", self._collection.find_one(filter, projection=projection, sort=sort))
+
+    async def find(self, filter, *, projection=None, sort=None, limit=0):
+        return await self._timed(
+            "find", self._collection.find(filter, projection=projection, sort=sort, limit=limit)
+        )
+
+    async def count_documents(self, filter):
+        return await self._timed("count_documents", self._collection.count_documents(filter))
+
+    async def insert_one(self, document):
+        return await self._timed("insert_one", self._collection.insert_one(document))
+
+    async def update_one(self, filter, update, *, upsert=False):
+        return await self._timed("update_one", self._collection.update_one(filter, update, upsert=upsert))
+
+    async def bulk_write(self, requests, *, ordered=True):
+        return await self._timed("bulk_write", self._collection.bulk_write(requests, ordered=ordered))
+
+    async def delete_many(self, filter):
+        return await self._timed("delete_many", self._collection.delete_many(filter))
+
+    async def create_index(self, keys, **kwargs):
+        return await self._timed("create_index", self._collection.create_index(keys, **kwargs))
+
+
+def _driver() -> str:
+    return os.getenv("MONGODB_ASYNC_DRIVER", "thread").lower()
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ThreadPoolExecutor:
+    workers = int(os.getenv("MONGODB_THREAD_POOL_SIZE", "16"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mongo")
+
+
+@lru_cache(maxsize=None)
+def get_collection(name: str) -> AsyncCollection:
+    driver = _driver()
+    if driver == "thread":
+        return TimedCollection(ThreadedCollection(get_db()[name], _executor()), name)
+    if driver == "motor":
+        return TimedCollection(MotorCollection(get_async_db()[name]), name)
+    raise RuntimeError(f"Unknown MONGODB_ASYNC_DRIVER: {driver}")
+
+
+def bookings() -> AsyncCollection:
+    return get_collection(bookings_collection_name())
+
+
+def booking_versions() -> AsyncCollection:
+    return get_collection(booking_versions_collection_name())
+
+
+def users() -> AsyncCollection:
+    return get_collection(users_collection_name())
+
+
+def flight_info() -> AsyncCollection:
+    return get_collection(flight_info_collection_name())
+
+
+def revoked_tokens() -> AsyncCollection:
+    return get_collection(revoked_tokens_collection_name())
+
+
+def checkpoints() -> AsyncCollection:
+    return get_collection(checkpoints_collection_name())
+
+
+def checkpoint_writes() -> AsyncCollection:
+    return get_collection(checkpoint_writes_collection_name())
+
+
+async def find_latest_booking(user_id: str) -> dict[str, Any] | None:
+    if not user_id:
+        return None
+    return await bookings().find_one({"user_id": user_id}, projection=BOOKING_PROJECTION, sort=BOOKING_ORDER)
+
+
+def _bookings_query(
+    user_id: str,
+    origin: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    when: str | None = None,
+) -> dict[str, Any]:
+    query: dict[str, Any] = {"user_id": user_id}
+    if origin:
+        query["origin"] = origin
+    if destination:
+        query["destination"] = destination
+    if status:
+        query["status"] = status
+    if when == "upcoming":
+        query["date"] = {"$gte": datetime.now(timezone.utc)}
+    elif when == "past":
+        query["date"] = {"$lt": datetime.now(timezone.utc)}
+    elif when is not None:
+        raise ValueError(f"Unknown booking range: {when}")
+    return query
+
+
+async def find_bookings(
+    user_id: str,
+    origin: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    when: str | None = None,
+    *,
+    limit: int = 0,
+    after: tuple[Any, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Bookings newest first, or soonest first for `when="upcoming"`.
+
+    `after` is the (date, _id) of the last row already returned.
+    """
+    query = _bookings_query(user_id, origin, destination, status, when)
+    order = UPCOMING_ORDER if when == "upcoming" else BOOKING_ORDER
+    if after is not None:
+        date, booking_id = after
+        strict, inclusive = ("$gt", "$gte") if order is UPCOMING_ORDER else ("$lt", "$lte")
+        # The top-level bound lets the planner scan the index from `date` on; $or then
+        # only drops the rows of that same date already returned.
+        query["date"] = {**query.get("date", {}), inclusive: date}
+        query["$or"] = [{"date": {strict: date}}, {"_id": {strict: booking_id}}]
+    return await bookings().find(query, projection=BOOKING_PROJECTION, sort=order, limit=limit)
+
+
+async def count_bookings(
+    user_id: str,
+    origin: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    when: str | None = None,
+) -> int:
+    return await bookings().count_documents(_bookings_query(user_id, origin, destination, status, when))
+
+
+async def find_booking_by_flight(user_id: str, flight_number: str) -> dict[str, Any] | None:
+    return await bookings().find_one(
+        {"user_id": user_id, "flight_number": flight_number}, projection=BOOKING_PROJECTION
+    )
+
+
+async def insert_booking(booking: dict[str, Any]) -> str:
+    result = await bookings().insert_one(booking)
+    return str(result.inserted_id)
+
+
+async def ensure_booking(booking: dict[str, Any]) -> None:
+    fields = {k: v for k, v in booking.items() if k != "_id"}
+    await bookings().update_one({"_id": booking["_id"]}, {"$setOnInsert": fields}, upsert=True)
+
+
+async def get_booking_version(user_id: str) -> int:
+    doc = await booking_versions().find_one({"_id": user_id})
+    return int(doc.get("version", 0)) if doc else 0
+
+
+async def bump_booking_version(user_id: str) -> None:
+    await booking_versions().update_one({"_id": user_id}, {"$inc": {"version": 1}}, upsert=True)
+
+
+async def find_flight_info(flight_number: str) -> dict[str, Any] | None:
+    return await flight_info().find_one({"flight_number": flight_number})
+
+
+async def ensure_flight_info(info: dict[str, Any]) -> None:
+    await flight_info().update_one(
+        {"flight_number": info["flight_number"]}, {"$setOnInsert": info}, upsert=True
+    )
+
+
+async def insert_revoked_token(token_id: str, expires_at: datetime) -> bool:
+    """Record a token as revoked. False if it already was: the insert is the check, so two
+    workers racing to use the same token cannot both succeed."""
+    try:
+        await revoked_tokens().insert_one({"_id": token_id, "expires_at": expires_at})
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def find_user_by_username(username: str) -> dict[str, Any] | None:
+    return await users().find_one({"username": username})
+
+
+async def find_user_by_id(user_id: str) -> dict[str, Any] | None:
+    return await users().find_one({"user_id": user_id})
+
+
+async def insert_user(user: dict[str, Any]) -> None:
+    await users().insert_one(user)
+
+
+async def ensure_user(user: dict[str, Any]) -> None:
+    """Insert the user unless the username exists. Safe when several workers start at once:
+    the upsert only writes on insert, and a concurrent insert that wins the race is fine."""
+    try:
+        await users().update_one({"username": user["username"]}, {"$setOnInsert": user}, upsert=True)
+    except DuplicateKeyError:
+        pass
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from app.intent import topic_keywords
+
+
+# Extra terms per info_topic, on top of the intent keywords that detected the topic.
+_TOPIC_TERMS: dict[str, tuple[str, ...]] = {
+    "meals": ("beverage", "drink", "complimentary", "menu"),
+    "wifi": ("internet", "connectivity", "onboard"),
+    "baggage": ("allowance", "checked", "cabin", "kg", "bag"),
+    "aircraft": ("airbus", "boeing", "embraer", "atr", "uses", "operated"),
+    "seating": ("row", "exit", "recline", "inch"),
+}
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its me my of on or the this to was what "
+    "with does do can will there their flight".split()
+)
+_SECTION = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"'])")
+_TOKEN = re.compile(r"[a-z]+|\d+")
+_JOINED_HYPHEN = re.compile(r"(?<=[a-z])-(?=[a-z])")
+
+_K1 = 1.2
+_B = 0.75
+
+
+def _stem(token: str) -> str:
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    # "Wi-Fi" and "wifi" must meet, as must "meals" and "meal".
+    text = _JOINED_HYPHEN.sub("", text.lower())
+    return [_stem(token) for token in _TOKEN.findall(text) if token not in _STOPWORDS]
+
+
+def split_chunks(text: str) -> list[str]:
+    """Split a document into sections (blank-line separated), then into sentences."""
+    chunks: list[str] = []
+    for section in _SECTION.split(text):
+        chunks.extend(sentence.strip() for sentence in _SENTENCE.split(section.strip()) if sentence.strip())
+    return chunks
+
+
+def topic_terms(topic: str) -> list[str]:
+    return tokenize(" ".join((*topic_keywords(topic), *_TOPIC_TERMS.get(topic, ()))))
+
+
+@dataclass
+class _Chunk:
+    text: str
+    terms: Counter
+    length: int
+
+
+class FlightInfoIndex:
+    """In-process BM25 index over the sentence chunks of every flight-info document.
+
+    Term statistics are corpus-wide; a search is scoped to one flight's chunks.
+    Re-adding a flight replaces its chunks, so the index follows document updates.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: dict[str, list[_Chunk]] = {}
+        self._digests: dict[str, str] = {}
+        self._doc_freq: Counter = Counter()
+        self._total_chunks = 0
+        self._total_length = 0
+
+    def is_current(self, flight_number: str, text: str) -> bool:
+        return self._digests.get(flight_number) == _digest(text)
+
+    def add(self, flight_number: str, text: str) -> None:
+        self.remove(flight_number)
+        chunks = []
+        for sentence in split_chunks(text):
+            terms = Counter(tokenize(sentence))
+            chunks.append(_Chunk(sentence, terms, sum(terms.values())))
+            self._doc_freq.update(terms.keys())
+            self._total_length += chunks[-1].length
+        self._chunks[flight_number] = chunks
+        self._digests[flight_number] = _digest(text)
+        self._total_chunks += len(chunks)
+
+    def remove(self, flight_number: str) -> None:
+        for chunk in self._chunks.pop(flight_number, []):
+            self._doc_freq.subtract(chunk.terms.keys())
+            self._total_length -= chunk.length
+            self._total_chunks -= 1
+        self._digests.pop(flight_number, None)
+        self._doc_freq += Counter()  # in-place add keeps only positive counts
+
+    def search(self, flight_number: str, query: list[str], k: int) -> list[tuple[float, int, str]]:
+        """Top-k (score, position, chunk) for the query terms, best first; chunks scoring 0 are left out."""
+        chunks = self._chunks.get(flight_number, [])
+        if not chunks or not query:
+            return []
+        average_length = self._total_length / self._total_chunks if self._total_chunks else 1.0
+        query_terms = Counter(query)
+        idf = {
+            term: math.log(1 + (self._total_chunks - self._doc_freq[term] + 0.5) / (self._doc_freq[term] + 0.5))
+            for term in query_terms
+        }
+        scored = []
+        for position, chunk in enumerate(chunks):
+            score = 0.0
+            norm = _K1 * (1 - _B + _B * chunk.length / average_length)
+            for term, weight in query_terms.items():
+                frequency = chunk.terms.get(term)
+                if frequency:
+                    score += weight * idf[term] * frequency * (_K1 + 1) / (frequency + norm)
+            if score > 0:
+                scored.append((score, position, chunk.text))
+        scored.sort(key=lambda hit: (-hit[0], hit[1]))
+        return scored[:k]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+_INDEX = FlightInfoIndex()
+
+
+def _top_k() -> int:
+    return int(os.getenv("FLIGHT_INFO_TOP_K", "2"))
+
+
+def index_flight_info(flight_number: str, details_text: str) -> None:
+    if not _INDEX.is_current(flight_number, details_text):
+        _INDEX.add(flight_number, details_text)
+
+
+def retrieve_context(flight_number: str, details_text: str, question: str, topic: str = "") -> str:
+    """The chunks of `details_text` most relevant to the question and topic, in document order.
+
+    Falls back to the whole document when nothing matches, so the LLM is never left without context.
+    """
+    index_flight_info(flight_number, details_text)
+    # The flight number itself is in the question and in the document's first sentence, but
+    # says nothing about which part of the document is wanted.
+    ignored = set(tokenize(flight_number))
+    # Topic terms count twice: the router has already decided what the user is asking about.
+    query = [term for term in tokenize(question) if term not in ignored] + topic_terms(topic) * 2
+    hits = _INDEX.search(flight_number, query, _top_k())
+    if not hits:
+        return details_text
+    return " ".join(text for _, _, text in sorted(hits, key=lambda hit: hit[1]))
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+from app import repository
+from app.cache import TTLCache
+
+
+# Refresh-token revocation. The source of truth is the revoked_tokens collection: a TTL
+# index drops each entry once the token has expired, and every worker shares it. Revoking
+# is an insert keyed by jti, so "was it revoked?" and "revoke it" are one atomic call.
+# The local cache remembers tokens this worker has seen revoked, so replays of a used or
+# logged-out token are turned away without a round trip. It is bounded by
+# REVOKED_TOKEN_CACHE_SIZE and each entry lives only until its token expires.
+@lru_cache(maxsize=1)
+def _local() -> TTLCache:
+    return TTLCache(maxsize=int(os.getenv("REVOKED_TOKEN_CACHE_SIZE", "10000")), ttl=0)
+
+
+def _remember(token_id: str, expires_at: datetime) -> None:
+    ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+    if ttl > 0:
+        _local().set(token_id, True, ttl=ttl)
+
+
+async def revoke(token_id: str, expires_at: datetime) -> bool:
+    """Revoke a refresh token. True if this call revoked it, False if it was already revoked."""
+    if _local().get(token_id):
+        return False
+    revoked = await repository.insert_revoked_token(token_id, expires_at)
+    _remember(token_id, expires_at)
+    return revoked
+
+
+def stats() -> dict[str, Any]:
+    return _local().stats()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from app import booking_cache, repository
+from app.auth import decode_access_token
+from app.dates import display_datetime, iso_utc, parse_iso_datetime
+
+
+def _authorized_user_id(access_token: str) -> str | None:
+    auth = decode_access_token(access_token)
+    if not auth.is_authenticated or not auth.user_id:
+        return None
+    return auth.user_id
+
+
+def _date_fields(value: Any, display: str | None) -> tuple[str, str]:
+    if isinstance(value, datetime):
+        return iso_utc(value), display or display_datetime(value)
+    # A document written before dates were stored natively (see app/migrations.py).
+    text = str(value or "")
+    if not text:
+        return "", "an unknown time"
+    try:
+        return text, display_datetime(parse_iso_datetime(text))
+    except ValueError:
+        return text, text
+
+
+def booking_payload(doc: dict[str, Any]) -> dict[str, str]:
+    """The one Mongo document -> API booking mapping, shared by the endpoints and the agent tools."""
+    date, date_display = _date_fields(doc.get("date"), doc.get("date_display"))
+    return {
+        "booking_id": str(doc.get("_id")),
+        "user_id": str(doc.get("user_id", "")),
+        "flight_number": str(doc.get("flight_number", "")),
+        "origin": str(doc.get("origin", "")),
+        "destination": str(doc.get("destination", "")),
+        "date": date,
+        "date_display": date_display,
+        "status": str(doc.get("status", "")),
+    }
+
+
+def _owned_booking(doc: dict[str, Any] | None, user_id: str) -> dict[str, str] | None:
+    if not doc or doc.get("user_id") != user_id:
+        return None
+    return booking_payload(doc)
+
+
+async def get_latest_booking(access_token: str) -> dict[str, str] | None:
+    user_id = _authorized_user_id(access_token)
+    if not user_id:
+        return None
+    return _owned_booking(await booking_cache.find_latest_booking(user_id), user_id)
+
+
+async def get_all_bookings(access_token: str, limit: int = 0) -> list[dict[str, str]]:
+    user_id = _authorized_user_id(access_token)
+    if not user_id:
+        return []
+    docs = await booking_cache.find_bookings(user_id, limit=limit)
+    return [booking_payload(doc) for doc in docs if doc.get("user_id") == user_id]
+
+
+async def count_bookings(access_token: str) -> int:
+    user_id = _authorized_user_id(access_token)
+    if not user_id:
+        return 0
+    return await booking_cache.count_bookings(user_id)
+
+
+async def get_booking_by_flight(access_token: str, flight_number: str) -> dict[str, str] | None:
+    user_id = _authorized_user_id(access_token)
+    if not user_id or not flight_number:
+        return None
+    return _owned_booking(await booking_cache.find_booking_by_flight(user_id, flight_number), user_id)
+
+
+async def get_flight_info(access_token: str, flight_number: str) -> dict[str, Any] | None:
+    if not _authorized_user_id(access_token) or not flight_number:
+        return None
+    info = await repository.find_flight_info(flight_number)
+    if not info:
+        return None
+    return {
+        "flight_number": str(info.get("flight_number", "")),
+        "details_text": str(info.get("details_text", "")),
+        "facts": info.get("facts") or {},
+    }
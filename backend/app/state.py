@@ -13,3 +13,6 @@ class AgentState(TypedDict):
     intent: str
     flight_number: str
     info_topic: str
+    # Rolling summary of messages[:summarized_count]; maintained off the request path.
+    summary: str
+    summarized_count: int
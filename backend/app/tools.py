@@ -1,85 +1,118 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable, TypeVar
 
-import httpx
+from app import services
+from app.http_client import ToolUnavailableError, get_tool_http_client
+from app.booking_cache import find_latest_booking
+from app.metrics import TOOL_CALL_SECONDS
 
-from app.db import get_bookings_collection
+T = TypeVar("T")
 
 
-def get_latest_booking_db(user_id: str) -> dict[str, Any] | None:
-    if not user_id:
-        return None
-    collection = get_bookings_collection()
-    return collection.find_one({"user_id": user_id}, sort=[("date", -1)])
+def _tool_mode() -> str:
+    # "inprocess" calls the service layer directly; "http" keeps the API-first path for split deployments.
+    return os.getenv("TOOL_MODE", "inprocess").lower()
+
+
+async def get_latest_booking_db(user_id: str) -> dict[str, Any] | None:
+    return await find_latest_booking(user_id)
+
+
+async def _call_tool(
+    tool: str, in_process: Callable[..., Awaitable[T]], via_api: Callable[..., Awaitable[T]], *args: Any
+) -> T:
+    mode = _tool_mode()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await (via_api(*args) if mode == "http" else in_process(*args))
+        outcome = "ok"
+        return result
+    except ToolUnavailableError:
+        outcome = "unavailable"
+        raise
+    finally:
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started, tool, mode, outcome)
+
+
+async def get_latest_booking(access_token: str) -> dict[str, Any] | None:
+    return await _call_tool(
+        "get_latest_booking", services.get_latest_booking, get_latest_booking_via_api, access_token
+    )
+
+
+async def get_all_bookings(access_token: str, limit: int = 0) -> list[dict[str, Any]]:
+    return await _call_tool(
+        "get_all_bookings", services.get_all_bookings, get_all_bookings_via_api, access_token, limit
+    )
+
+
+async def count_bookings(access_token: str) -> int:
+    return await _call_tool("count_bookings", services.count_bookings, count_bookings_via_api, access_token)
+
+
+async def get_booking_by_flight(access_token: str, flight_number: str) -> dict[str, Any] | None:
+    return await _call_tool(
+        "get_booking_by_flight",
+        services.get_booking_by_flight,
+        get_booking_by_flight_via_api,
+        access_token,
+        flight_number,
+    )
+
+
+async def get_flight_info(access_token: str, flight_number: str) -> dict[str, Any] | None:
+    return await _call_tool(
+        "get_flight_info", services.get_flight_info, get_flight_info_via_api, access_token, flight_number
+    )
 
 
 async def get_latest_booking_via_api(access_token: str) -> dict[str, Any] | None:
     if not access_token:
         return None
-    base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
     # API-first: booking lookup goes through HTTP so auth/audit stays in one layer.
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{base_url}/bookings/latest",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-        if resp.status_code != 200:
-            return None
-        return resp.json()
-    except httpx.HTTPError:
+    resp = await get_tool_http_client().get("/bookings/latest", access_token)
+    if resp.status_code != 200:
         return None
+    return resp.json()
 
 
-async def get_all_bookings_via_api(access_token: str) -> list[dict[str, Any]]:
+async def get_all_bookings_via_api(access_token: str, limit: int = 0) -> list[dict[str, Any]]:
     if not access_token:
         return []
-    base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{base_url}/bookings",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-        if resp.status_code != 200:
-            return []
-        data = resp.json()
-        return data if isinstance(data, list) else []
-    except httpx.HTTPError:
+    path = f"/bookings?limit={limit}" if limit else "/bookings"
+    resp = await get_tool_http_client().get(path, access_token)
+    if resp.status_code != 200:
         return []
+    data = resp.json()
+    return data if isinstance(data, list) else []
+
+
+async def count_bookings_via_api(access_token: str) -> int:
+    if not access_token:
+        return 0
+    resp = await get_tool_http_client().get("/bookings/count", access_token)
+    if resp.status_code != 200:
+        return 0
+    return int(resp.json().get("total", 0))
 
 
 async def get_booking_by_flight_via_api(access_token: str, flight_number: str) -> dict[str, Any] | None:
     if not access_token or not flight_number:
         return None
-    base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{base_url}/bookings/flight/{flight_number}",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-        if resp.status_code != 200:
-            return None
-        return resp.json()
-    except httpx.HTTPError:
+    resp = await get_tool_http_client().get(f"/bookings/flight/{flight_number}", access_token)
+    if resp.status_code != 200:
         return None
+    return resp.json()
 
 
 async def get_flight_info_via_api(access_token: str, flight_number: str) -> dict[str, Any] | None:
     if not access_token or not flight_number:
         return None
-    base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{base_url}/flight-info/{flight_number}",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-        if resp.status_code != 200:
-            return None
-        return resp.json()
-    except httpx.HTTPError:
+    resp = await get_tool_http_client().get(f"/flight-info/{flight_number}", access_token)
+    if resp.status_code != 200:
         return None
+    return resp.json()
@@ -0,0 +1,104 @@
+"""Per-request auth cost: JWT verification per call vs the verified-token cache.
+
+Reports the cost of one auth check (the previous middleware's decode + header split
+against a cache hit), then, through the real app, how many JWT verifications and how
+much latency each request type costs with the cache off and on. A "show my bookings"
+chat turn verifies the token at the route and again in every tool call; /health and
+/login no longer look at the header at all. Chat latency is not reported: the thread's
+history grows with every turn.
+
+    python -m bench.auth_overhead
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+
+import httpx
+
+from app import auth
+
+
+def _legacy_middleware_auth(header: str) -> tuple[auth.AuthResult, str | None]:
+    # What auth_middleware did on every request, with no cache in front of jwt.decode.
+    result = auth.decode_bearer_token(header)
+    parts = header.split()
+    return result, parts[1] if len(parts) == 2 and parts[0].lower() == "bearer" else None
+
+
+def _per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def _through_app(client: httpx.AsyncClient, method: str, path: str, repeat: int, **kwargs) -> tuple[float, float]:
+    calls = 0
+    decode = auth.jwt.decode
+
+    def counting_decode(*args, **kw):
+        nonlocal calls
+        calls += 1
+        return decode(*args, **kw)
+
+    auth.jwt.decode = counting_decode
+    samples = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            resp = await client.request(method, path, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+            resp.raise_for_status()
+    finally:
+        auth.jwt.decode = decode
+    return calls / repeat, statistics.median(samples)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    import app.main as main_module
+
+    header = f"Bearer {auth.create_token('user_123')}"
+    cache_size = auth._verified().maxsize
+
+    auth._verified().maxsize = 0
+    legacy_us = _per_call_us(lambda: _legacy_middleware_auth(header), 20_000)
+    auth._verified().maxsize = cache_size
+    cached_us = _per_call_us(lambda: auth.decode_bearer_token(header), 20_000)
+    print(f"one auth check: middleware decode {legacy_us:.1f} us | cached {cached_us:.2f} us")
+
+    requests = [
+        ("GET /health", "GET", "/health", {}),
+        ("POST /login", "POST", "/login", {"json": {"username": "user_123", "password": "demo-pass"}}),
+        ("GET /bookings/count", "GET", "/bookings/count", {"headers": {"Authorization": header}}),
+        ("POST /chat (bookings)", "POST", "/chat",
+         {"headers": {"Authorization": header}, "json": {"message": "show my bookings"}}),
+    ]
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.post("/seed")).raise_for_status()
+        for name, method, path, kwargs in requests:
+            repeat = args.repeat if name != "POST /login" else 10
+            auth._verified().maxsize = 0
+            auth._verified().clear()
+            off = await _through_app(client, method, path, repeat, **kwargs)
+            auth._verified().maxsize = cache_size
+            on = await _through_app(client, method, path, repeat, **kwargs)
+            latency = "" if path == "/chat" else f" | median {off[1]:.2f} ms -> {on[1]:.2f} ms"
+            print(f"{name:<22} jwt verifications/request: cache off {off[0]:.2f}, on {on[0]:.2f}{latency}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
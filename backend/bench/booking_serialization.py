@@ -0,0 +1,122 @@
+"""GET /bookings latency at 1k and 10k rows per user: per-row models vs the mapper + orjson path.
+
+Both handlers run in the real app through the ASGI transport, with route auth and
+routing included. The repository is replaced by an in-memory list so only mapping and
+serialization differ. "legacy" is the previous handler body, which built a BookingResponse
+per row and let response_model validate and encode the list a second time.
+
+    python -m bench.booking_serialization
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+# Every request must reach the (fake) repository and the mapper.
+os.environ.setdefault("BOOKING_CACHE_SIZE", "0")
+
+import httpx
+from bson import ObjectId
+from fastapi import Depends
+
+from app import repository
+from app.auth import create_token
+from app.dates import booking_date_fields
+
+
+def _docs(rows: int) -> list[dict]:
+    docs = []
+    for i in range(rows):
+        fields = booking_date_fields(datetime(2026, 1 + i % 12, 1 + i % 28, 14, tzinfo=timezone.utc))
+        # As pymongo returns BSON dates: naive, in UTC.
+        fields["date"] = fields["date"].replace(tzinfo=None)
+        docs.append(
+            {
+                "_id": ObjectId(),
+                "user_id": "user_123",
+                "flight_number": f"AI-{100 + i % 900}",
+                "origin": "Pune",
+                "destination": "Delhi",
+                **fields,
+                "status": "Confirmed",
+            }
+        )
+    return docs
+
+
+def _install_legacy_route(app, BookingResponse, current_caller) -> None:
+    @app.get("/bench/legacy-bookings", response_model=list[BookingResponse])
+    async def legacy_list_bookings(caller=Depends(current_caller)):
+        docs = await repository.find_bookings(caller.user_id)
+        results: list[BookingResponse] = []
+        for doc in docs:
+            results.append(
+                BookingResponse(
+                    booking_id=str(doc.get("_id")),
+                    user_id=str(doc.get("user_id", "")),
+                    flight_number=str(doc.get("flight_number", "")),
+                    origin=str(doc.get("origin", "")),
+                    destination=str(doc.get("destination", "")),
+                    date=str(doc.get("date", "")),
+                    date_display=str(doc.get("date_display", "")),
+                    status=str(doc.get("status", "")),
+                )
+            )
+        return results
+
+
+async def _measure(client: httpx.AsyncClient, path: str, headers: dict, repeat: int) -> tuple[float, float, bytes]:
+    samples: list[float] = []
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        resp = await client.get(path, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        body = resp.content
+    return statistics.median(samples), max(samples), body
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    import app.main as main_module
+
+    _install_legacy_route(main_module.app, main_module.BookingResponse, main_module.current_caller)
+    headers = {"Authorization": f"Bearer {create_token('user_123')}"}
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for rows in args.rows:
+            docs = _docs(rows)
+
+            async def find_bookings(user_id, *_args, limit=0, after=None, **_kwargs):
+                return docs[:limit] if limit else docs
+
+            repository.find_bookings = find_bookings
+            main_module.repository.find_bookings = find_bookings
+            legacy = await _measure(client, "/bench/legacy-bookings", headers, args.repeat)
+            current = await _measure(client, "/bookings", headers, args.repeat)
+            legacy_ids = [row["booking_id"] for row in httpx.Response(200, content=legacy[2]).json()]
+            current_ids = [row["booking_id"] for row in httpx.Response(200, content=current[2]).json()]
+            if legacy_ids != current_ids:
+                print(f"FAIL: responses differ at {rows} rows")
+                return 1
+            print(
+                f"rows={rows:<6} legacy median={legacy[0]:8.2f} ms max={legacy[1]:8.2f} ms | "
+                f"orjson median={current[0]:8.2f} ms max={current[1]:8.2f} ms | "
+                f"speedup x{legacy[0] / current[0]:.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
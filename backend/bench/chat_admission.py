@@ -0,0 +1,132 @@
+"""Concurrent /chat turns: per-thread serialization, coalescing and admission control.
+
+Runs the real app with a fake LLM (fixed latency, no network):
+
+1. Lost updates: --burst different messages sent at once on one thread. "unlocked" calls
+   graph.ainvoke directly, like the previous handler; "locked" goes through /chat.
+   Reports how many of the turns survive in the thread's checkpoint.
+2. Double-send: --burst identical messages at once; reports graph runs and LLM calls.
+3. Overload: --users anonymous sessions at once, with CHAT_MAX_CONCURRENT_RUNS high
+   enough to admit all of them and then set to --limit. Reports p50/p99 of accepted turns and how fast the
+   excess is refused.
+4. Anonymous session: two /chat turns with no token from the frontend's origin, sending
+   back the X-Chat-Session id the first reply carried and no cookie, like the browser
+   does cross-site. Both must land on the same thread, and a 503 must carry the id too.
+
+    python -m bench.chat_admission
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+os.environ.setdefault("LLM_CACHE_SIZE", "0")
+
+import httpx
+from langchain_core.messages import HumanMessage
+
+from app import chat_threads
+from app.auth import create_token
+from bench import fake_llm
+
+
+def _ms(samples: list[float]) -> str:
+    if not samples:
+        return "-"
+    p99 = statistics.quantiles(samples, n=100, method="inclusive")[98] if len(samples) > 1 else samples[0]
+    return f"p50={statistics.median(samples):7.1f} ms p99={p99:7.1f} ms"
+
+
+async def _timed(coro) -> tuple[float, httpx.Response]:
+    started = time.perf_counter()
+    resp = await coro
+    return (time.perf_counter() - started) * 1000, resp
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-ms", type=float, default=100.0)
+    parser.add_argument("--burst", type=int, default=3)
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+
+    fake = fake_llm.install(args.llm_ms / 1000)
+    import app.main as main_module
+
+    graph = main_module.graph
+    headers = {"Authorization": f"Bearer {create_token('bench_user')}"}
+    transport = httpx.ASGITransport(app=main_module.app)
+    failed = False
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        messages = [f"tell me something nice number {i}" for i in range(args.burst)]
+        unlocked_config = {"configurable": {"thread_id": "bench_unlocked"}}
+        await asyncio.gather(
+            *(graph.ainvoke({"messages": [HumanMessage(content=m)]}, config=unlocked_config) for m in messages)
+        )
+        os.environ["CHAT_MAX_QUEUED_PER_THREAD"] = str(args.burst)
+        await asyncio.gather(*(client.post("/chat", headers=headers, json={"message": m}) for m in messages))
+        del os.environ["CHAT_MAX_QUEUED_PER_THREAD"]
+        for name, thread_id in (("unlocked", "bench_unlocked"), ("locked", "bench_user")):
+            snapshot = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+            kept = sum(isinstance(m, HumanMessage) for m in snapshot.values.get("messages", []))
+            print(f"lost updates  {name:<9} {args.burst} concurrent turns, {kept} kept in the thread")
+            failed |= name == "locked" and kept != args.burst
+
+        body = {"message": "what can you do"}
+        runs, calls = chat_threads.stats()["runs"], fake.calls
+        resps = await asyncio.gather(*(client.post("/chat", headers=headers, json=body) for _ in range(args.burst)))
+        runs, calls = chat_threads.stats()["runs"] - runs, fake.calls - calls
+        print(f"double-send   {args.burst} identical messages -> {runs} graph run(s), {calls} LLM call(s), "
+              f"statuses {sorted(r.status_code for r in resps)}")
+        failed |= runs != 1
+
+        for limit in (args.users, args.limit):
+            os.environ["CHAT_MAX_CONCURRENT_RUNS"] = str(limit)
+            results = await asyncio.gather(
+                *(
+                    _timed(client.post("/chat", json=body, headers={"Cookie": f"chat_session={i:032x}"}))
+                    for i in range(args.users)
+                )
+            )
+            os.environ.pop("CHAT_MAX_CONCURRENT_RUNS", None)
+            accepted = [ms for ms, resp in results if resp.status_code == 200]
+            refused = [ms for ms, resp in results if resp.status_code == 503]
+            print(f"overload      limit={limit:<3} {args.users} users: {len(accepted)} served {_ms(accepted)} | "
+                  f"{len(refused)} refused {_ms(refused)}")
+            if limit < args.users:
+                failed |= not refused or any(not resp.headers.get("retry-after") for _, resp in results
+                                             if resp.status_code == 503)
+
+    # A fresh client per request: no cookie jar, so only the header ties the turns together.
+    origin = {"Origin": "http://localhost:5173"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await client.post("/chat", headers=origin, json={"message": "my name is Asha"})
+    session = first.headers.get("x-chat-session", "")
+    exposed = "x-chat-session" in first.headers.get("access-control-expose-headers", "").lower()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        second = await client.post(
+            "/chat", headers={**origin, "X-Chat-Session": session}, json={"message": "what is my name"}
+        )
+        os.environ["CHAT_MAX_CONCURRENT_RUNS"] = "0"
+        refused = await client.post("/chat", headers=origin, json=body)
+        os.environ.pop("CHAT_MAX_CONCURRENT_RUNS", None)
+    snapshot = await graph.aget_state({"configurable": {"thread_id": f"anon:{session}"}})
+    turns = sum(isinstance(m, HumanMessage) for m in snapshot.values.get("messages", []))
+    shared = bool(session) and second.headers.get("x-chat-session") == session and turns == 2
+    print(f"anon session  2 cross-origin turns -> {'one thread' if shared else 'separate threads'} "
+          f"({turns} turn(s) on anon:{session or '?'}), header exposed to CORS: {exposed}, "
+          f"{refused.status_code} carries id: {bool(refused.headers.get('x-chat-session'))}")
+    failed |= not (shared and exposed and refused.status_code == 503 and refused.headers.get("x-chat-session"))
+    print("chat:", chat_threads.stats())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,76 @@
+"""A stand-in for AsyncGroq's chat.completions, for benches that run the app offline.
+
+    fake = fake_llm.install(latency=0.2, chunks=4)
+    ...
+    print(fake.calls)
+
+install() points app.llm at the fake; every helper (agent replies, classify_intent,
+summaries) then gets `content` after `latency` seconds, streamed in `chunks` parts when
+asked to stream, with usage reported the way Groq does. `content` is a string or a
+function of the request's messages.
+"""
+from __future__ import annotations
+
+import asyncio
+import types
+from typing import Callable
+
+from app import llm
+
+UNKNOWN_INTENT = '{"intent": "unknown", "flight_number": ""}'
+REPLY = "Sure, happy to help."
+
+
+def is_classify(messages: list[dict]) -> bool:
+    return "Classify user intent" in messages[0]["content"]
+
+
+def reply_or_classify(reply: str = REPLY, intent: str = UNKNOWN_INTENT) -> Callable[[list[dict]], str]:
+    """Content that answers classify_intent with `intent` and everything else with `reply`."""
+    return lambda messages: intent if is_classify(messages) else reply
+
+
+class FakeCompletions:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        content: str | Callable[[list[dict]], str] = REPLY,
+        chunks: int = 1,
+    ) -> None:
+        self.latency = latency
+        self.content = content
+        self.chunks = max(chunks, 1)
+        self.calls = 0
+
+    async def create(self, *, model, messages, temperature, stream=False):
+        self.calls += 1
+        text = self.content(messages) if callable(self.content) else self.content
+        usage = types.SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+            completion_tokens=max(len(text) // 4, 1),
+        )
+        if not stream:
+            await asyncio.sleep(self.latency)
+            message = types.SimpleNamespace(content=text)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+        async def chunks():
+            words = text.split(" ")
+            step = -(-len(words) // self.chunks)
+            for start in range(0, len(words), step):
+                await asyncio.sleep(self.latency / self.chunks)
+                part = " ".join(words[start:start + step]) + (" " if start + step < len(words) else "")
+                delta = types.SimpleNamespace(content=part)
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], x_groq=None)
+            # Groq reports a stream's usage on its last chunk.
+            yield types.SimpleNamespace(choices=[], x_groq=types.SimpleNamespace(usage=usage))
+
+        return chunks()
+
+
+def install(
+    latency: float = 0.0, content: str | Callable[[list[dict]], str] = REPLY, chunks: int = 1
+) -> FakeCompletions:
+    fake = FakeCompletions(latency, content, chunks)
+    llm._client = lambda: types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake))
+    return fake
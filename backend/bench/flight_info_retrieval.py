@@ -0,0 +1,162 @@
+"""Recall and latency of topic-aware flight-info retrieval (app/retrieval.py).
+
+Builds flight-info documents of growing length: one fact sentence per topic, buried in
+filler about check-in, fares and airport services. For every (flight, topic, question
+template) it checks that the topic's fact sentence is among the retrieved chunks
+(recall@k). It also reports retrieval latency and the prompt size sent to the LLM
+compared with the whole document. Exits non-zero if recall drops below --min-recall.
+
+It also runs every question through app.flight_facts: the share answered from a template
+is reported, and questions in NOT_TEMPLATED, which touch a topic keyword without asking
+for the stored field, must go to retrieval + LLM instead. Any template answer for them
+is a failure.
+
+    python -m bench.flight_info_retrieval
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from app import retrieval
+from app.flight_facts import answer_from_facts, extract_flight_facts
+from app.intent import match_intent
+
+FACTS = {
+    "meals": [
+        "Complimentary meal for flights over 2 hours.",
+        "A hot vegetarian meal and a soft drink are served free of charge.",
+        "Snacks and beverages can be bought from the onboard menu.",
+    ],
+    "wifi": [
+        "Wi-Fi is available (paid).",
+        "Wi-Fi is not available.",
+        "Free Wi-Fi messaging is offered on all seats.",
+    ],
+    "baggage": [
+        "Baggage allowance is 20kg checked and 7kg cabin.",
+        "Each passenger may bring one 7kg cabin bag and check 15kg of luggage.",
+        "Checked baggage is limited to 25kg per passenger.",
+    ],
+    "aircraft": [
+        "The flight is operated by an Airbus A320neo.",
+        "This route uses a Boeing 737-8.",
+        "The aircraft type is an ATR 72-600.",
+    ],
+    "seating": [
+        "Seat pitch is 31 in.",
+        "Exit rows offer extra legroom for a fee.",
+        "Standard seats recline 4 inches and have a 30 in pitch.",
+    ],
+}
+FILLER = [
+    "Check-in closes 45 minutes before departure.",
+    "Boarding starts 30 minutes before departure at the gate shown on your pass.",
+    "Fares include taxes and airport fees.",
+    "Changes are allowed up to 2 hours before departure for a fee.",
+    "Priority boarding can be added during booking.",
+    "Infants under 2 travel on an adult's lap.",
+    "Pets are not permitted in the cabin on this route.",
+    "The airport lounge is open to business class passengers.",
+    "Web check-in opens 48 hours before departure.",
+    "Travel insurance can be purchased at checkout.",
+    "Unaccompanied minors must be booked through the call centre.",
+    "Sports equipment is carried as special items.",
+    "Refunds are processed within 7 working days.",
+    "Mobile boarding passes are accepted at all gates.",
+    "The departure terminal is listed in your confirmation email.",
+]
+QUESTIONS = {
+    "meals": ["Is food served on {fn}?", "Do I get a meal on {fn}?", "Any snacks on {fn}?"],
+    "wifi": ["Is there wifi on {fn}?", "Does {fn} have Wi-Fi?", "can I use wifi on {fn}"],
+    "baggage": ["What is the baggage allowance on {fn}?", "How much luggage can I take on {fn}?"],
+    "aircraft": ["What aircraft is {fn}?", "Which plane type flies {fn}?"],
+    "seating": ["How much legroom on {fn}?", "What's the seat pitch on {fn}?", "seat size on {fn}?"],
+}
+
+NOT_TEMPLATED = [
+    "Is there USB charging at my seat on {fn}?",
+    "Do exit rows have more legroom on {fn}?",
+    "What type of seat is it on {fn}?",
+    "Is the plane delayed on {fn}?",
+]
+
+
+def build_docs(flights: int, filler_sentences: int, rng: random.Random) -> dict[str, tuple[str, dict[str, str]]]:
+    docs = {}
+    for i in range(flights):
+        fn = f"AI-{100 + i}"
+        facts = {topic: rng.choice(options) for topic, options in FACTS.items()}
+        sentences = [rng.choice(FILLER) for _ in range(filler_sentences)] + list(facts.values())
+        rng.shuffle(sentences)
+        docs[fn] = (" ".join(sentences), facts)
+    return docs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flights", type=int, default=50)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[5, 50, 200], help="filler sentences per doc")
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    worst_recall = 1.0
+    for length in args.lengths:
+        retrieval._INDEX = retrieval.FlightInfoIndex()
+        docs = build_docs(args.flights, length, rng)
+        started = time.perf_counter()
+        for fn, (text, _) in docs.items():
+            retrieval.index_flight_info(fn, text)
+        ingest_ms = (time.perf_counter() - started) * 1000
+
+        hits = total = templated = 0
+        wrongly_templated: list[str] = []
+        latencies: list[float] = []
+        full_chars = context_chars = 0
+        for fn, (text, facts) in docs.items():
+            extracted = extract_flight_facts(text)
+            for template in NOT_TEMPLATED:
+                question = template.format(fn=fn)
+                match = match_intent(question)
+                topic = match.info_topic if match else ""
+                if answer_from_facts(fn, topic, extracted, question) is not None:
+                    wrongly_templated.append(question)
+            for topic, templates in QUESTIONS.items():
+                for template in templates:
+                    question = template.format(fn=fn)
+                    templated += answer_from_facts(fn, topic, extracted, question) is not None
+                    started = time.perf_counter()
+                    context = retrieval.retrieve_context(fn, text, question, topic)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    total += 1
+                    hits += facts[topic] in context
+                    full_chars += len(text)
+                    context_chars += len(context)
+        recall = hits / total
+        worst_recall = min(worst_recall, recall)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(
+            f"filler={length:<4} chunks/doc={length + len(FACTS):<4} recall@{retrieval._top_k()}={recall:.3f} "
+            f"retrieve p50={statistics.median(latencies):.3f} ms p99={p99:.3f} ms "
+            f"ingest={ingest_ms / len(docs):.3f} ms/doc prompt chars {full_chars // total} -> {context_chars // total}"
+        )
+        print(f"  answered from facts: {templated / total:.1%} of questions; "
+              f"{len(wrongly_templated)} templated answers to questions that did not ask for the field")
+        if wrongly_templated:
+            for question in sorted(set(wrongly_templated))[:10]:
+                print(f"  FAIL: templated: {question!r}")
+            return 1
+    if worst_recall < args.min_recall:
+        print(f"FAIL: recall {worst_recall:.3f} below {args.min_recall}")
+        return 1
+    print(f"OK: recall >= {args.min_recall}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Semantic intent cache: LLM calls saved, answer accuracy and lookup cost.
+
+Replays a stream of messages that the rules do not resolve through graph._determine_intent,
+with a fake classify_intent that answers with the corpus label after --llm-ms. The
+stream is the fallback messages of bench/data/intent_labels.jsonl followed by --rounds
+of rephrasings (filler words, punctuation, case, dropped or doubled letters). Reports
+LLM calls and routing time with the cache off and on, the hit rate, how many cache
+answers disagree with the label, and the lookup cost once the cache holds
+--fill unrelated entries. Exits non-zero if the cache answers wrongly more than
+--max-wrong of the time.
+
+    python -m bench.intent_cache
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+
+from app import intent_cache
+from app.graph import _determine_intent
+from app.intent import match_intent
+from bench import fake_llm
+
+CORPUS = Path(__file__).resolve().parent / "data" / "intent_labels.jsonl"
+_PREFIXES = ("", "", "hey, ", "hi ", "ok ", "so ", "quick question: ")
+_SUFFIXES = ("", "", "?", "!", " please", " thanks", " pls")
+
+
+def _rephrase(text: str, rng: random.Random) -> str:
+    words = text.rstrip("?!.").split()
+    if len(words) > 2 and rng.random() < 0.5:
+        i = rng.randrange(len(words))
+        word = words[i]
+        if len(word) > 3:
+            j = rng.randrange(1, len(word) - 1)
+            words[i] = word[:j] + word[j + 1:] if rng.random() < 0.5 else word[:j] + word[j] + word[j:]
+    out = rng.choice(_PREFIXES) + " ".join(words) + rng.choice(_SUFFIXES)
+    return out.lower() if rng.random() < 0.5 else out
+
+
+async def _replay(stream: list[tuple[str, str]]) -> tuple[float, int]:
+    wrong = 0
+    started = time.perf_counter()
+    for text, label in stream:
+        intent, _, _ = await _determine_intent(text)
+        wrong += intent != label
+    return time.perf_counter() - started, wrong
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--llm-ms", type=float, default=20.0)
+    parser.add_argument("--fill", type=int, default=2000, help="entries in the cache for the lookup timing")
+    parser.add_argument("--max-wrong", type=float, default=0.02, help="allowed share of wrong cache answers")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    with CORPUS.open(encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh if line.strip()]
+    rng = random.Random(args.seed)
+    base = [(row["text"], row["intent"]) for row in rows if match_intent(row["text"]) is None]
+    stream = list(base)
+    for _ in range(args.rounds):
+        variants = [(_rephrase(text, rng), label) for text, label in base]
+        stream.extend((text, label) for text, label in variants if match_intent(text) is None)
+    labels = dict(stream)
+
+    def classify(messages: list[dict]) -> str:
+        # A perfect classifier: the label of the message.
+        return json.dumps({"intent": labels.get(messages[-1]["content"], "unknown"), "flight_number": ""})
+
+    fake = fake_llm.install(args.llm_ms / 1000, classify)
+
+    cache = intent_cache._cache()
+    maxsize = cache.maxsize
+    cache.maxsize = 0
+    off_seconds, _ = await _replay(stream)
+    off_calls = fake.calls
+    cache.maxsize = maxsize
+    cache.hits = cache.exact_hits = cache.misses = 0
+    fake.calls = 0
+    on_seconds, wrong = await _replay(stream)
+    stats = intent_cache.stats()
+    print(f"{len(stream)} fallback messages ({len(base)} originals + {len(stream) - len(base)} rephrasings)")
+    print(f"cache off: {off_calls} LLM calls, {off_seconds:.2f} s")
+    print(f"cache on:  {fake.calls} LLM calls, {on_seconds:.2f} s, hit rate {stats['hit_rate']:.1%} "
+          f"({stats['hits'] - stats['exact_hits']} near, {stats['exact_hits']} exact), {wrong} wrong answers")
+
+    filler = random.Random(args.seed + 1)
+    letters = "abcdefghijklmnopqrstuvwxyz     "
+    for _ in range(args.fill):
+        cache.set("".join(filler.choice(letters) for _ in range(filler.randint(15, 60))), "unknown")
+    samples = []
+    for text, _ in stream:
+        started = time.perf_counter()
+        cache.get(_rephrase(text, rng) + " x")
+        samples.append((time.perf_counter() - started) * 1000)
+    p99 = statistics.quantiles(samples, n=100, method="inclusive")[98]
+    print(f"lookup with {len(cache)} entries: p50={statistics.median(samples):.3f} ms p99={p99:.3f} ms")
+    if wrong > args.max_wrong * len(stream):
+        print("FAIL: the cache returned too many wrong intents")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,169 @@
+"""Intent routing on a labelled corpus: rule hit rate, LLM fallbacks, latency and accuracy.
+
+Runs every message in bench/data/intent_labels.jsonl through graph._determine_intent,
+the router the agent node uses. Each message is labelled with the intent a person would
+expect (latest, all, flight, flight_info, unknown) and, for flight and flight_info, the
+flight number. The corpus is not limited to what the rules currently get right.
+
+Reports, per intent and overall:
+- the share of messages resolved by the rules and the share that fall back to
+  classify_intent;
+- accuracy against the labels, and the precision of each rule: how often the rules
+  are right when they claim a message for that intent;
+- routing latency of each path.
+
+By default classify_intent talks to a fake client that answers "unknown" after
+--llm-ms, so fallback accuracy only counts the messages that really are unknown. Use
+--llm groq (with GROQ_API_KEY set) to measure the real classifier. --output saves the
+numbers as JSON; --min-accuracy / --min-rule-precision turn it into a gate.
+
+    python -m bench.intent_routing
+    python -m bench.intent_routing --llm groq --show-errors
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+# Every fallback here should reach classify_intent; bench.intent_cache measures the cache.
+os.environ.setdefault("INTENT_CACHE_SIZE", "0")
+
+from app.graph import _determine_intent
+from app.intent import match_intent
+from bench import fake_llm
+
+CORPUS = Path(__file__).resolve().parent / "data" / "intent_labels.jsonl"
+INTENTS = ("latest", "all", "flight", "flight_info", "unknown")
+
+
+def load_corpus() -> list[dict]:
+    with CORPUS.open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _same_flight(a: str, b: str) -> bool:
+    return a.upper().replace("-", "").replace(" ", "") == b.upper().replace("-", "").replace(" ", "")
+
+
+def _ms(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {
+        "p50_ms": round(cuts[49], 4),
+        "p99_ms": round(cuts[98], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def _ratio(part: int, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm", choices=("fake", "groq"), default="fake")
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="fake classifier latency")
+    parser.add_argument("--show-errors", action="store_true", help="print every misrouted message")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--min-accuracy", type=float, default=0.0)
+    parser.add_argument("--min-rule-precision", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.llm == "fake":
+        fake_llm.install(args.llm_ms / 1000, fake_llm.UNKNOWN_INTENT)
+
+    corpus = load_corpus()
+    counts: dict[str, Counter] = {intent: Counter() for intent in INTENTS}
+    predicted: Counter = Counter()
+    # Keyed by the intent the rules returned, not the label: precision of each rule.
+    rule_claims: Counter = Counter()
+    rule_hits: Counter = Counter()
+    latency: dict[str, list[float]] = {"rules": [], "llm": []}
+    errors = []
+    for row in corpus:
+        source = "rules" if match_intent(row["text"]) is not None else "llm"
+        started = time.perf_counter()
+        intent, flight_number, _ = await _determine_intent(row["text"])
+        latency[source].append((time.perf_counter() - started) * 1000)
+        correct = intent == row["intent"] and (
+            intent not in {"flight", "flight_info"} or _same_flight(flight_number, row["flight_number"])
+        )
+        stats = counts[row["intent"]]
+        stats["messages"] += 1
+        stats[source] += 1
+        stats["correct"] += correct
+        stats[f"{source}_correct"] += correct
+        predicted[intent] += 1
+        if source == "rules":
+            rule_claims[intent] += 1
+            rule_hits[intent] += correct
+        if not correct:
+            errors.append((source, row["text"], row["intent"], row["flight_number"], intent, flight_number))
+
+    total = Counter()
+    for stats in counts.values():
+        total.update(stats)
+    result = {
+        "llm": args.llm,
+        "messages": len(corpus),
+        "rules_share": _ratio(total["rules"], total["messages"]),
+        "llm_fallback_share": _ratio(total["llm"], total["messages"]),
+        "accuracy": _ratio(total["correct"], total["messages"]),
+        "rule_precision": _ratio(total["rules_correct"], total["rules"]),
+        "llm_accuracy": _ratio(total["llm_correct"], total["llm"]),
+        "latency": {source: _ms(samples) for source, samples in latency.items()},
+        "intents": {
+            intent: {
+                "messages": stats["messages"],
+                "rules": stats["rules"],
+                "llm": stats["llm"],
+                "accuracy": _ratio(stats["correct"], stats["messages"]),
+                "predicted": predicted[intent],
+                "rule_claims": rule_claims[intent],
+                "rule_precision": _ratio(rule_hits[intent], rule_claims[intent]) if rule_claims[intent] else None,
+            }
+            for intent, stats in counts.items()
+        },
+    }
+
+    header = ("intent", "msgs", "rules", "llm", "accuracy", "predicted", "rule claims", "rule prec")
+    print(f"{header[0]:<12}" + "".join(f"{name:>12}" for name in header[1:]))
+    for intent, stats in result["intents"].items():
+        precision = "-" if stats["rule_precision"] is None else f"{stats['rule_precision']:.1%}"
+        print(f"{intent:<12}{stats['messages']:>12}{stats['rules']:>12}{stats['llm']:>12}"
+              f"{stats['accuracy']:>12.1%}{stats['predicted']:>12}{stats['rule_claims']:>12}{precision:>12}")
+    print(f"{'total':<12}{total['messages']:>12}{total['rules']:>12}{total['llm']:>12}{result['accuracy']:>12.1%}"
+          f"{total['messages']:>12}{total['rules']:>12}{result['rule_precision']:>12.1%}")
+    print(f"rules resolve {result['rules_share']:.1%} of messages, {result['llm_fallback_share']:.1%} fall back "
+          f"to classify_intent ({args.llm})")
+    for source, stats in result["latency"].items():
+        if stats:
+            print(f"{source:<6} routing p50={stats['p50_ms']:.3f} ms p99={stats['p99_ms']:.3f} ms")
+    mean = statistics.fmean(latency["rules"] + latency["llm"])
+    print(f"mean routing cost per message {mean:.3f} ms")
+    if args.llm == "fake":
+        print("fake classifier answers 'unknown': LLM accuracy only counts truly unknown messages")
+
+    if args.show_errors:
+        for source, text, label, label_flight, intent, flight_number in errors:
+            print(f"  [{source}] {text!r}: expected {label} {label_flight}, got {intent} {flight_number}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+    if result["accuracy"] < args.min_accuracy or result["rule_precision"] < args.min_rule_precision:
+        print("FAIL: below --min-accuracy or --min-rule-precision")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
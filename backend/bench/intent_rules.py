@@ -0,0 +1,130 @@
+"""Rule-engine equivalence check and per-message microbenchmark for intent routing.
+
+Compares app.intent.match_intent with the rule chain _determine_intent used before
+it was compiled into a table (kept below verbatim), on the corpus in
+bench/data/intent_corpus.jsonl and on random mutations of it. Exits non-zero on
+any difference.
+
+    python -m bench.intent_rules
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from app.intent import match_intent
+
+CORPUS = Path(__file__).resolve().parent / "data" / "intent_corpus.jsonl"
+
+
+def _legacy_normalize_text(text: str) -> str:
+    text = re.sub(r"[\u2010-\u2015]", "-", text)
+    return " ".join(re.sub(r"[^a-z0-9\s-]", " ", text.lower()).split())
+
+
+def _legacy_needs_booking_lookup(text: str) -> bool:
+    lowered = text.lower()
+    keywords = ("booking", "flight", "ticket", "where am i flying", "where am i travelling")
+    return any(k in lowered for k in keywords)
+
+
+def legacy_match(text: str) -> tuple[str, str, str] | None:
+    normalized = _legacy_normalize_text(text)
+    info_topic = ""
+    if any(k in normalized for k in ("meal", "food", "snack")):
+        info_topic = "meals"
+    elif "wifi" in normalized:
+        info_topic = "wifi"
+    elif "baggage" in normalized or "luggage" in normalized:
+        info_topic = "baggage"
+    elif "aircraft" in normalized or "plane" in normalized or "type" in normalized:
+        info_topic = "aircraft"
+    elif "seat" in normalized or "legroom" in normalized or "pitch" in normalized:
+        info_topic = "seating"
+    flight_match = re.search(r"\b([A-Z]{2,3}-?\d{2,4})\b", text.upper().replace("–", "-").replace("—", "-").replace("‑", "-"))
+    if flight_match:
+        if info_topic:
+            return "flight_info", flight_match.group(1), info_topic
+        return "flight", flight_match.group(1), ""
+    if re.search(r"\b(all|list|show)\s+(my\s+)?flight(s)?\b", normalized) or re.search(
+        r"\b(all|list|show)\s+(my\s+)?booking(s)?\b", normalized
+    ) or re.search(r"\b(all|list|show)\s+(my\s+)?trip(s)?\b", normalized):
+        return "all", "", ""
+    if re.search(r"\b(latest|next|upcoming)\b", normalized) or "where am i flying" in normalized:
+        return "latest", "", ""
+    if any(k in normalized for k in ("itinerary", "travel plans", "trip info")):
+        return "all", "", ""
+    if info_topic:
+        return "flight_info", "", info_topic
+    if _legacy_needs_booking_lookup(text):
+        return "latest", "", ""
+    return None
+
+
+def compiled_match(text: str) -> tuple[str, str, str] | None:
+    match = match_intent(text)
+    return None if match is None else (match.intent, match.flight_number, match.info_topic)
+
+
+def load_corpus() -> list[dict]:
+    with CORPUS.open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _mutations(texts: list[str], count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = "aAzZ09 -_.,!?'\t\n‐‑–—―ßİé✈️😀٣"
+    out = []
+    for _ in range(count):
+        chars = list(rng.choice(texts))
+        for _ in range(rng.randint(1, 4)):
+            pos = rng.randrange(len(chars) + 1)
+            op = rng.random()
+            if op < 0.4:
+                chars.insert(pos, rng.choice(alphabet))
+            elif op < 0.7 and chars:
+                del chars[min(pos, len(chars) - 1)]
+            elif chars:
+                i = min(pos, len(chars) - 1)
+                chars[i] = chars[i].swapcase()
+        out.append("".join(chars))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=20000, help="random mutations to compare")
+    parser.add_argument("--number", type=int, default=200, help="timing loops over the corpus")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    texts = [row["text"] for row in corpus]
+    mismatches = []
+    for row in corpus:
+        expected = tuple(row["expected"]) if row["expected"] is not None else None
+        for name, fn in (("legacy", legacy_match), ("compiled", compiled_match)):
+            if fn(row["text"]) != expected:
+                mismatches.append((name, row["text"], fn(row["text"]), expected))
+    for text in _mutations(texts, args.fuzz, seed=7):
+        if legacy_match(text) != compiled_match(text):
+            mismatches.append(("fuzz", text, compiled_match(text), legacy_match(text)))
+    for mismatch in mismatches[:20]:
+        print("MISMATCH", mismatch)
+
+    per_message = {}
+    for name, fn in (("legacy", legacy_match), ("compiled", compiled_match)):
+        seconds = min(timeit.repeat(lambda: [fn(t) for t in texts], number=args.number, repeat=3))
+        per_message[name] = seconds / (args.number * len(texts)) * 1e6
+        print(f"{name:>8}: {per_message[name]:.2f} us/message over {len(texts)} corpus messages")
+    print(f" speedup: {per_message['legacy'] / per_message['compiled']:.2f}x")
+    print(f"checked {len(corpus)} labelled + {args.fuzz} fuzzed messages, {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Offline load test: mixed /login, /chat, /bookings and /flight-info traffic.
+
+Runs the real app in-process with no Groq key and no mongod: the LLM client is a fake
+that answers after --llm-ms (streamed in a few chunks), Mongo is mongomock, and chat
+memory is the in-memory checkpointer. --users accounts are created with a few bookings
+each. For each --concurrency level, that many clients loop for --duration seconds. Each
+client signs in as one of the users (that first login is not timed) and picks requests
+by --mix weight. Prints throughput and p50/p95/p99 per endpoint and writes everything
+to --output as JSON.
+
+Pass --baseline with an earlier output to compare: p95 per endpoint and level is printed
+next to the baseline's, and the run exits non-zero if any grows by more than
+--max-regression.
+
+    python -m bench.load_test --concurrency 1,8,32 --duration 10 --output before.json
+    python -m bench.load_test --concurrency 1,8,32 --duration 10 --baseline before.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+
+import httpx
+
+from app import repository
+from app.dates import booking_date_fields
+from app.users import create_user
+from bench import fake_llm
+
+_PASSWORD = "load-pass"
+_ROUTES = ("cdg", "bom", "del", "blr", "maa", "hyd")
+_CHAT_MESSAGES = (
+    "show my bookings",
+    "what is my latest booking",
+    "what is the baggage allowance on AI-999",
+    "is there wifi on flight AI-888",
+    "can you tell me something about travelling light",
+    "how do I change my seat",
+)
+_FLIGHTS = ("AI-888", "AI-999")
+_LLM_CHUNKS = 4
+_LLM_REPLY = "Here is what I found for you, based on your booking details."
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in {"login", "chat", "bookings", "flight_info"}:
+            raise argparse.ArgumentTypeError(f"unknown endpoint in --mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+async def _create_users(count: int) -> list[str]:
+    usernames = []
+    start = datetime.now(timezone.utc)
+    for index in range(count):
+        user_id = f"load_user_{index}"
+        await create_user(user_id=user_id, username=user_id, password=_PASSWORD)
+        for offset in range(3):
+            origin, destination = random.sample(_ROUTES, 2)
+            await repository.insert_booking(
+                {
+                    "user_id": user_id,
+                    "flight_number": _FLIGHTS[offset % len(_FLIGHTS)],
+                    "origin": origin.upper(),
+                    "destination": destination.upper(),
+                    **booking_date_fields((start + timedelta(days=7 * offset - 7)).isoformat()),
+                    "status": "Confirmed",
+                }
+            )
+        usernames.append(user_id)
+    return usernames
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> httpx.Response:
+    return await client.post("/login", json={"username": username, "password": _PASSWORD})
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    username: str,
+    mix: dict[str, float],
+    deadline: float,
+    rng: random.Random,
+    samples: dict[str, list[float]],
+    statuses: dict[str, dict[int, int]],
+) -> None:
+    resp = await _login(client, username)
+    while resp.status_code != 200:  # the KDF queue may shed a burst of first logins
+        await asyncio.sleep(float(resp.headers.get("retry-after", "1")))
+        resp = await _login(client, username)
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        if name == "login":
+            resp = await _login(client, username)
+        elif name == "chat":
+            resp = await client.post("/chat", headers=headers, json={"message": rng.choice(_CHAT_MESSAGES)})
+        elif name == "bookings":
+            resp = await client.get("/bookings", headers=headers, params={"limit": 20})
+        else:
+            resp = await client.get(f"/flight-info/{rng.choice(_FLIGHTS)}", headers=headers)
+        samples[name].append((time.perf_counter() - started) * 1000)
+        statuses[name][resp.status_code] = statuses[name].get(resp.status_code, 0) + 1
+
+
+def _summary(latencies: list[float], codes: dict[int, int], seconds: float) -> dict:
+    if not latencies:
+        return {"requests": 0}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / seconds, 2),
+        "errors": sum(count for code, count in codes.items() if code >= 400),
+        "statuses": {str(code): count for code, count in sorted(codes.items())},
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    usernames: list[str],
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict:
+    samples: dict[str, list[float]] = {name: [] for name in mix}
+    statuses: dict[str, dict[int, int]] = {name: {} for name in mix}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client_loop(
+                client, usernames[i % len(usernames)], mix, deadline, random.Random(seed + i), samples, statuses
+            )
+            for i in range(concurrency)
+        )
+    )
+    seconds = time.perf_counter() - started
+    endpoints = {name: _summary(samples[name], statuses[name], seconds) for name in mix}
+    total = sum(len(values) for values in samples.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": round(seconds, 2),
+        "requests": total,
+        "throughput_rps": round(total / seconds, 2),
+        "endpoints": endpoints,
+    }
+
+
+def _revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return out.stdout.strip()
+
+
+def _compare(result: dict, baseline: dict, max_regression: float) -> bool:
+    before = {level["concurrency"]: level["endpoints"] for level in baseline["levels"]}
+    regressed = False
+    print(f"\nvs baseline {baseline.get('revision', '?')} (p95, ms):")
+    for level in result["levels"]:
+        for name, stats in level["endpoints"].items():
+            old = before.get(level["concurrency"], {}).get(name, {})
+            if not old.get("requests") or not stats.get("requests"):
+                continue
+            change = stats["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+            flag = "  REGRESSION" if change > max_regression else ""
+            regressed |= bool(flag)
+            print(f"  c={level['concurrency']:<4} {name:<12} {old['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f} "
+                  f"({change:+.0%}){flag}")
+    return regressed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--llm-ms", type=float, default=200.0)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("login=1,chat=3,bookings=4,flight_info=2"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load_test.json")
+    parser.add_argument("--baseline", help="earlier --output to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth vs --baseline")
+    args = parser.parse_args()
+    levels = [int(value) for value in args.concurrency.split(",")]
+
+    random.seed(args.seed)
+    fake = fake_llm.install(args.llm_ms / 1000, fake_llm.reply_or_classify(_LLM_REPLY), chunks=_LLM_CHUNKS)
+    import app.main as main_module
+
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        (await client.post("/seed")).raise_for_status()
+        usernames = await _create_users(args.users)
+        results = []
+        for concurrency in levels:
+            level = await _run_level(client, usernames, args.mix, concurrency, args.duration, args.seed)
+            results.append(level)
+            print(f"concurrency={concurrency:<4} {level['requests']:6d} requests  "
+                  f"{level['throughput_rps']:8.1f} req/s")
+            for name, stats in level["endpoints"].items():
+                if not stats["requests"]:
+                    continue
+                print(f"  {name:<12} {stats['throughput_rps']:8.1f} req/s  p50={stats['p50_ms']:8.2f}  "
+                      f"p95={stats['p95_ms']:8.2f}  p99={stats['p99_ms']:8.2f} ms  errors={stats['errors']}")
+
+    result = {
+        "revision": _revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "duration_s": args.duration,
+            "users": args.users,
+            "llm_ms": args.llm_ms,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "llm_calls": fake.calls,
+        "levels": results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as fh:
+            if _compare(result, json.load(fh), args.max_regression):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
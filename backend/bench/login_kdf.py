@@ -0,0 +1,88 @@
+"""Event-loop latency during a login burst: inline pbkdf2 vs the bounded KDF pool.
+
+Fires --burst concurrent POST /login requests through the real app while a probe
+measures how late a 1 ms sleep wakes up on the same loop, i.e. how long every other
+request on the worker is stalled. "inline" is the previous handler, which verified the
+password on the event loop. The last scenario shrinks the pool queue and checks that
+the overflow is turned away with 503 + Retry-After instead of waiting.
+
+    python -m bench.login_kdf
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+
+import httpx
+
+from app import kdf
+
+
+async def _inline_verify(plain_password: str, password_hash: str) -> bool:
+    return kdf._PWD_CONTEXT.verify(plain_password, password_hash)
+
+
+async def _burst(client: httpx.AsyncClient, burst: int) -> tuple[float, float, dict[int, int]]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+
+    async def probe() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - started) * 1000 - 1)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.01)
+    body = {"username": "user_123", "password": "demo-pass"}
+    responses = await asyncio.gather(*(client.post("/login", json=body) for _ in range(burst)))
+    stop.set()
+    await probe_task
+    codes: dict[int, int] = {}
+    for resp in responses:
+        codes[resp.status_code] = codes.get(resp.status_code, 0) + 1
+    if 503 in codes and not all(r.headers.get("retry-after") for r in responses if r.status_code == 503):
+        raise AssertionError("503 without Retry-After")
+    return statistics.quantiles(lags, n=100, method="inclusive")[98], max(lags), codes
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=32)
+    args = parser.parse_args()
+
+    import app.main as main_module
+
+    await main_module.ensure_demo_user()
+    pooled_verify = main_module.verify_password
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        main_module.verify_password = _inline_verify
+        inline = await _burst(client, args.burst)
+        main_module.verify_password = pooled_verify
+        pooled = await _burst(client, args.burst)
+        os.environ["KDF_QUEUE_SIZE"] = "0"
+        shed = await _burst(client, args.burst)
+        del os.environ["KDF_QUEUE_SIZE"]
+
+    for name, (p99, worst, codes) in (("inline", inline), ("pool", pooled), ("pool, queue=0", shed)):
+        print(f"{name:<14} loop lag p99={p99:7.2f} ms max={worst:7.2f} ms  statuses={codes}")
+    print("kdf:", kdf.stats())
+    if pooled[0] >= inline[0]:
+        print("FAIL: the pool did not reduce event-loop lag")
+        return 1
+    if 503 not in shed[2]:
+        print("FAIL: a full queue did not shed load")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,111 @@
+"""Hot-path cost of the /metrics instrumentation.
+
+Times one histogram observation, one counter increment and the node wrapper around a
+no-op coroutine, then runs "show my bookings" chat turns through the real app with a
+zero-latency fake LLM and mongomock, counts how many metric updates a turn makes, and
+reports what they add up to (at the node wrapper's cost each) as a share of the turn. Also times a /metrics scrape.
+
+    python -m bench.metrics_overhead
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+os.environ.setdefault("LLM_CACHE_SIZE", "0")
+
+import httpx
+
+from app import metrics
+from app.auth import create_token
+from bench import fake_llm
+
+
+def _count_records() -> dict[str, int]:
+    counts = {"records": 0}
+    for cls, name in ((metrics.Histogram, "observe"), (metrics.Counter, "inc")):
+        original = getattr(cls, name)
+
+        def counting(self, *args, _original=original, **kwargs):
+            counts["records"] += 1
+            return _original(self, *args, **kwargs)
+
+        setattr(cls, name, counting)
+    return counts
+
+
+def _per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def _async_per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn(None)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--max-share", type=float, default=0.01, help="fail above this share of a turn")
+    args = parser.parse_args()
+
+    histogram = metrics.Histogram("bench_seconds", "bench", ("a", "b"))
+    counter = metrics.Counter("bench_total", "bench", ("a",))
+    observe_us = _per_call_us(lambda: histogram.observe(0.003, "x", "y"), 200_000)
+    inc_us = _per_call_us(lambda: counter.inc("x"), 200_000)
+
+    async def noop(state):
+        return state
+
+    bare_us = await _async_per_call_us(noop, 100_000)
+    wrapped_us = await _async_per_call_us(metrics.timed_node("bench", noop), 100_000)
+    metrics._REGISTRY.remove(histogram)
+    metrics._REGISTRY.remove(counter)
+    print(f"histogram observe {observe_us:.2f} us | counter inc {inc_us:.2f} us | "
+          f"node wrapper {wrapped_us - bare_us:.2f} us over a bare await")
+
+    fake_llm.install()
+    import app.main as main_module
+
+    headers = {"Authorization": f"Bearer {create_token('user_123')}"}
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.post("/seed")).raise_for_status()
+        await client.post("/chat", headers=headers, json={"message": "show my bookings"})
+        counts = _count_records()
+        samples = []
+        for _ in range(args.turns):
+            started = time.perf_counter()
+            resp = await client.post("/chat", headers=headers, json={"message": "show my bookings"})
+            samples.append((time.perf_counter() - started) * 1e6)
+            resp.raise_for_status()
+        per_turn = counts["records"] / args.turns
+        started = time.perf_counter()
+        scrape = await client.get("/metrics")
+        scrape_ms = (time.perf_counter() - started) * 1000
+
+    turn_us = statistics.median(samples)
+    cost_us = per_turn * max(observe_us, inc_us, wrapped_us - bare_us)
+    share = cost_us / turn_us
+    print(f"chat turn median {turn_us / 1000:.2f} ms, {per_turn:.1f} metric updates/turn "
+          f"= {cost_us:.1f} us ({share:.3%} of the turn)")
+    print(f"/metrics scrape {scrape_ms:.2f} ms, {len(scrape.text.splitlines())} lines")
+    if share > args.max_share:
+        print(f"FAIL: instrumentation is more than {args.max_share:.0%} of a chat turn")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,201 @@
+"""Correctness checks for MongoCheckpointSaver (app/mongo_checkpointer.py) on mongomock.
+
+Needs no mongod. Each check prints PASS or FAIL, and the run exits non-zero on any
+failure:
+
+1. Graph run and resume: a LangGraph graph with two parallel branches, one of which
+   fails on its first run, then an interrupt. A second saver instance (another worker)
+   resumes the failed run without re-running the branch that succeeded, then resumes
+   past the interrupt. aget_tuple is checked by checkpoint id and for the latest one.
+2. alist: newest first, with before= and limit=, a metadata filter, and across threads.
+3. aput_writes: --writers concurrent writers replaying the same task writes leave one
+   document per (task, idx); the first value of a regular write is kept and special
+   channels are overwritten.
+4. adelete_thread: removes the thread's checkpoints and writes and nothing else.
+
+    python -m bench.mongo_checkpointer
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import operator
+import os
+import sys
+from typing import Annotated, TypedDict
+
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+
+from langgraph.checkpoint.base import ERROR, empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+
+from app import repository
+from app.mongo_checkpointer import MongoCheckpointSaver
+
+
+class _State(TypedDict):
+    steps: Annotated[list[str], operator.add]
+
+
+def _build(saver: MongoCheckpointSaver, runs: dict[str, int], fail_once: set[str]):
+    def node(name: str):
+        async def run(state: _State) -> dict:
+            runs[name] = runs.get(name, 0) + 1
+            if name in fail_once:
+                fail_once.discard(name)
+                raise RuntimeError(f"{name} failed")
+            return {"steps": [name]}
+
+        return run
+
+    graph = StateGraph(_State)
+    for name in ("left", "right", "join", "finish"):
+        graph.add_node(name, node(name))
+    graph.add_edge(START, "left")
+    graph.add_edge(START, "right")
+    graph.add_edge(["left", "right"], "join")
+    graph.add_edge("join", "finish")
+    graph.add_edge("finish", END)
+    return graph.compile(checkpointer=saver, interrupt_before=["finish"])
+
+
+def _config(thread_id: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _checkpoint_id(config: dict) -> str:
+    return config["configurable"]["checkpoint_id"]
+
+
+async def _count(collection, thread_id: str) -> int:
+    return len(await collection.find({"thread_id": thread_id}))
+
+
+async def check_resume(report) -> None:
+    runs: dict[str, int] = {}
+    first = _build(MongoCheckpointSaver(), runs, fail_once={"right"})
+    try:
+        await first.ainvoke({"steps": []}, _config("resume"))
+    except RuntimeError:
+        pass
+    saver = MongoCheckpointSaver()
+    failed = await saver.aget_tuple(_config("resume"))
+    errors = [channel for _, channel, _ in failed.pending_writes] if failed else []
+    report("failed run keeps the successful branch's writes", failed is not None and ERROR in errors,
+           f"pending writes {errors}")
+
+    # Another worker picks the thread up from Mongo alone.
+    second = _build(saver, runs, fail_once=set())
+    await second.ainvoke(None, _config("resume"))
+    state = await second.aget_state(_config("resume"))
+    report("resume re-runs only the failed branch", runs == {"left": 1, "right": 2, "join": 1},
+           f"runs {runs}")
+    report("stops at the interrupt", state.next == ("finish",), f"next {state.next}")
+    await second.ainvoke(None, _config("resume"))
+    state = await second.aget_state(_config("resume"))
+    report("resume past the interrupt", sorted(state.values["steps"]) == ["finish", "join", "left", "right"]
+           and not state.next, f"steps {state.values['steps']}")
+
+    latest = await saver.aget_tuple(_config("resume"))
+    history = [item async for item in saver.alist(_config("resume"))]
+    parent = await saver.aget_tuple(latest.parent_config)
+    by_id = await saver.aget_tuple(_config("resume", _checkpoint_id(history[2].config)))
+    report("aget_tuple latest is the newest checkpoint", latest.config == history[0].config)
+    report("aget_tuple by id returns that checkpoint",
+           by_id is not None and by_id.checkpoint["id"] == history[2].checkpoint["id"]
+           and parent.config == history[1].config)
+    missing = await saver.aget_tuple(_config("resume", "does-not-exist"))
+    report("aget_tuple with an unknown id is None", missing is None)
+
+
+async def check_list(report) -> None:
+    saver = MongoCheckpointSaver()
+    graph = _build(saver, {}, fail_once=set())
+    for thread_id in ("list-a", "list-b"):
+        await graph.ainvoke({"steps": []}, _config(thread_id))
+        await graph.ainvoke(None, _config(thread_id))
+    history = [item async for item in saver.alist(_config("list-a"))]
+    ids = [_checkpoint_id(item.config) for item in history]
+    report("alist is newest first", ids == sorted(ids, reverse=True) and len(ids) > 3, f"{len(ids)} checkpoints")
+    before = [item async for item in saver.alist(_config("list-a"), before=history[1].config)]
+    report("alist before= excludes that checkpoint and newer",
+           [_checkpoint_id(item.config) for item in before] == ids[2:])
+    limited = [item async for item in saver.alist(_config("list-a"), before=history[0].config, limit=2)]
+    report("alist before= with limit=", [_checkpoint_id(item.config) for item in limited] == ids[1:3])
+    inputs = [item async for item in saver.alist(_config("list-a"), filter={"source": "input"}, limit=1)]
+    report("alist metadata filter applies before limit",
+           len(inputs) == 1 and inputs[0].metadata["source"] == "input")
+    everything = [item async for item in saver.alist(None)]
+    threads = {item.config["configurable"]["thread_id"] for item in everything}
+    report("alist without a config spans threads", {"list-a", "list-b"} <= threads)
+
+
+async def check_writes(report, writers: int) -> None:
+    saver = MongoCheckpointSaver()
+    config = await saver.aput(
+        _config("writes"), {**empty_checkpoint(), "id": "1ef00000-0000-6000-8000-000000000001"}, {}, {}
+    )
+    # Every writer replays the same task's writes, each with its own values, all at once.
+    await asyncio.gather(
+        *(saver.aput_writes(config, [("steps", [f"w{i}"]), ("other", i)], "task-1") for i in range(writers))
+    )
+    await asyncio.gather(*(saver.aput_writes(config, [(ERROR, f"error {i}")], "task-2") for i in range(writers)))
+    docs = await saver.writes.find({"thread_id": "writes"})
+    slots = sorted((doc["task_id"], doc["idx"]) for doc in docs)
+    report("concurrent replays leave one write per (task, idx)", slots == [("task-1", 0), ("task-1", 1),
+           ("task-2", -1)], f"{len(docs)} documents")
+    stored = {(task, channel): value for task, channel, value in (await saver.aget_tuple(config)).pending_writes}
+    await saver.aput_writes(config, [("steps", ["late"]), ("other", -1)], "task-1")
+    pending = {(task, channel): value for task, channel, value in (await saver.aget_tuple(config)).pending_writes}
+    kept = pending == stored and pending[("task-1", "other")] in range(writers)
+    report("regular writes keep the first value", kept, f"{stored} -> {pending}")
+    await saver.aput_writes(config, [(ERROR, "latest error")], "task-2")
+    pending = {(task, channel): value for task, channel, value in (await saver.aget_tuple(config)).pending_writes}
+    report("special channels are overwritten", pending[("task-2", ERROR)] == "latest error")
+
+
+async def check_delete(report) -> None:
+    saver = MongoCheckpointSaver()
+    graph = _build(saver, {}, fail_once={"right"})
+    for thread_id in ("delete-me", "keep-me"):
+        try:
+            await graph.ainvoke({"steps": []}, _config(thread_id))
+        except RuntimeError:
+            pass
+    before = await _count(saver.writes, "delete-me")
+    kept = (await _count(saver.checkpoints, "keep-me"), await _count(saver.writes, "keep-me"))
+    await saver.adelete_thread("delete-me")
+    gone = (await _count(saver.checkpoints, "delete-me"), await _count(saver.writes, "delete-me"))
+    report("adelete_thread removes checkpoints and writes", before > 0 and gone == (0, 0), f"left {gone}")
+    report("adelete_thread leaves other threads",
+           (await _count(saver.checkpoints, "keep-me"), await _count(saver.writes, "keep-me")) == kept)
+    report("deleted thread reads as empty", await saver.aget_tuple(_config("delete-me")) is None)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=16, help="concurrent aput_writes replays")
+    args = parser.parse_args()
+
+    failures = []
+
+    def report(name: str, ok: bool, detail: str = "") -> None:
+        print(f"{'PASS' if ok else 'FAIL'}  {name}" + (f" ({detail})" if detail and not ok else ""))
+        if not ok:
+            failures.append(name)
+
+    await repository.checkpoints().delete_many({})
+    await repository.checkpoint_writes().delete_many({})
+    await check_resume(report)
+    await check_list(report)
+    await check_writes(report, args.writers)
+    await check_delete(report)
+    print(f"{len(failures)} failed" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,97 @@
+"""Event-loop latency under a slow Mongo.
+
+Runs a stream of fast (no-DB) requests next to a growing number of concurrent
+requests against a fake collection whose calls block like pymongo does. With the
+old inline calls the fast requests queue behind every Mongo round-trip; with the
+threaded repository their p99 should stay flat.
+
+    python -m bench.mongo_concurrency
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.repository import ThreadedCollection
+
+
+class SlowFakeCollection:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def find_one(self, filter, projection=None, sort=None):
+        time.sleep(self.delay)
+        return {"_id": "booking_101", **filter}
+
+
+class InlineCollection:
+    """The pre-repository behaviour: a blocking call made straight from the coroutine."""
+
+    def __init__(self, collection: SlowFakeCollection) -> None:
+        self._collection = collection
+
+    async def find_one(self, filter, *, projection=None, sort=None):
+        return self._collection.find_one(filter, projection, sort=sort)
+
+
+def _p99(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=100)[98] if len(samples) > 1 else samples[0]
+
+
+async def _scenario(collection, slow_workers: int, duration: float) -> float:
+    stop = asyncio.Event()
+
+    async def slow_worker() -> None:
+        while not stop.is_set():
+            await collection.find_one({"user_id": "user_123"})
+            # Yield between requests the way a real handler would between awaits.
+            await asyncio.sleep(0)
+
+    workers = [asyncio.create_task(slow_worker()) for _ in range(slow_workers)]
+    await asyncio.sleep(0)
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    await asyncio.gather(*workers)
+    return _p99(latencies)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per scenario")
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 4, 16, 32])
+    parser.add_argument("--max-growth-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    fake = SlowFakeCollection(args.delay_ms / 1000)
+    executor = ThreadPoolExecutor(max_workers=max(args.levels) or 1)
+    drivers = {"inline": InlineCollection(fake), "thread": ThreadedCollection(fake, executor)}
+
+    results: dict[str, dict[int, float]] = {}
+    for name, collection in drivers.items():
+        results[name] = {}
+        for level in args.levels:
+            results[name][level] = await _scenario(collection, level, args.duration)
+            print(f"{name:>6}  slow_concurrency={level:<3} fast-request p99={results[name][level]:.2f} ms")
+    executor.shutdown()
+
+    threaded = results["thread"]
+    growth = max(threaded.values()) - threaded[min(args.levels)]
+    if growth > args.max_growth_ms:
+        print(f"FAIL: threaded p99 grew by {growth:.2f} ms under slow Mongo")
+        return 1
+    print(f"OK: threaded p99 grew by {growth:.2f} ms (limit {args.max_growth_ms} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
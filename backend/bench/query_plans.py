@@ -0,0 +1,55 @@
+"""Query-plan check: explain() every query shape the app issues and fail on a COLLSCAN.
+
+Shapes that use an index but still sort in memory are reported as "sort" without failing.
+Needs a real MongoDB (explain is not emulated by mongomock). Creates the indexes from
+app/indexes.py first, then checks each entry of QUERY_SHAPES against the winning plan.
+
+    MONGODB_URI=mongodb://localhost:27017 python -m bench.query_plans
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+from app.db import get_db
+from app.indexes import QUERY_SHAPES, ensure_indexes, plan_stages
+
+
+def explain(shape) -> dict:
+    cursor = get_db()[shape.collection()].find(shape.filter)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    if shape.limit:
+        cursor = cursor.limit(shape.limit)
+    return cursor.explain()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip-ensure", action="store_true", help="check the indexes that already exist")
+    args = parser.parse_args()
+    load_dotenv()
+    if not args.skip_ensure:
+        asyncio.run(ensure_indexes())
+
+    failures = 0
+    for shape in QUERY_SHAPES:
+        plan = explain(shape)["queryPlanner"]["winningPlan"]
+        stages = plan_stages(plan)
+        if "COLLSCAN" in stages:
+            label = "FAIL"
+            failures += 1
+        elif "SORT" in stages:
+            label = "sort"  # indexed, but sorted in memory
+        else:
+            label = "ok"
+        print(f"{label:<4} {shape.name:<34} {' <- '.join(stages)}")
+    print(f"\n{len(QUERY_SHAPES) - failures}/{len(QUERY_SHAPES)} query shapes use an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
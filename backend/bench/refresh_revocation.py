@@ -0,0 +1,100 @@
+"""Refresh-token revocation: memory held per worker and the cost of each check.
+
+"set" is the previous store, an in-process set that gained one jti per /refresh and
+never shrank. "store" is app/revocation.py: a bounded local cache in front of the
+revoked_tokens collection. Memory is measured with tracemalloc after --tokens
+refreshes. Latency is reported for a first use (one insert, which is also the check)
+and for a replay of a used token (answered from the local cache), against
+MONGODB_URI (default mongomock://, so the insert cost excludes the network).
+
+    python -m bench.refresh_revocation
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+os.environ.setdefault("MONGODB_URI", "mongomock://")
+os.environ.setdefault("REVOKED_TOKEN_CACHE_SIZE", "10000")
+
+from app import repository, revocation
+
+
+def _percentiles(samples: list[float]) -> str:
+    p99 = statistics.quantiles(samples, n=100)[98]
+    return f"p50={statistics.median(samples) * 1e6:7.1f} us p99={p99 * 1e6:7.1f} us"
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=5_000)
+    args = parser.parse_args()
+
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    token_ids = [uuid4().hex for _ in range(args.tokens)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    legacy: set[str] = set(token_ids)
+    legacy_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+
+    # Filling the local cache directly keeps the measurement to what the store holds in memory.
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for token_id in token_ids:
+        revocation._remember(token_id, expires_at)
+    store_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    print(f"memory after {args.tokens} refreshes: set {legacy_bytes / 1e6:.2f} MB (unbounded) | "
+          f"store {store_bytes / 1e6:.2f} MB ({len(revocation._local())} entries, "
+          f"cap {revocation._local().maxsize})")
+    revocation._local().clear()
+
+    legacy_checks = []
+    for token_id in token_ids[: args.samples]:
+        started = time.perf_counter()
+        _ = token_id in legacy
+        legacy_checks.append(time.perf_counter() - started)
+
+    first_use: list[float] = []
+    replay: list[float] = []
+    fresh = [uuid4().hex for _ in range(args.samples)]
+    for token_id in fresh:
+        started = time.perf_counter()
+        if not await revocation.revoke(token_id, expires_at):
+            print("FAIL: a new token was reported as revoked")
+            return 1
+        first_use.append(time.perf_counter() - started)
+    for token_id in fresh:
+        started = time.perf_counter()
+        if await revocation.revoke(token_id, expires_at):
+            print("FAIL: a used token was accepted again")
+            return 1
+        replay.append(time.perf_counter() - started)
+
+    # Another worker: nothing cached locally, so the replay is caught by the collection.
+    revocation._local().clear()
+    for token_id in fresh[:100]:
+        if await revocation.revoke(token_id, expires_at):
+            print("FAIL: a token used on another worker was accepted")
+            return 1
+
+    print(f"set membership          {_percentiles(legacy_checks)}")
+    print(f"store first use (insert) {_percentiles(first_use)}")
+    print(f"store replay (local)     {_percentiles(replay)}")
+    stored = await repository.revoked_tokens().count_documents({})
+    print(f"revoked_tokens documents: {stored}; cross-worker replay rejected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -6,6 +6,7 @@ const API_BASE = import.meta.env.VITE_API_BASE || 'http://127.0.0.1:8000'
 const storageKeys = {
   access: 'aba_access_token',
   refresh: 'aba_refresh_token',
+  chatSession: 'aba_chat_session',
 }
 
 function readTokens() {
@@ -151,9 +152,15 @@ function App() {
         headers: {
           'Content-Type': 'application/json',
           Authorization: `Bearer ${accessToken}`,
+          // Keeps an anonymous conversation on its own thread; a cookie would not come back cross-origin.
+          'X-Chat-Session': localStorage.getItem(storageKeys.chatSession) || '',
         },
         body: JSON.stringify({ message: trimmed }),
       })
+      const session = res.headers.get('X-Chat-Session')
+      if (session) {
+        localStorage.setItem(storageKeys.chatSession, session)
+      }
       return res
     }
 